@@ -1,7 +1,9 @@
 import random
 from typing import Any
 
-from constants import EMPTY, COMPONENTS, FINISHED
+from constants import EMPTY, COMPONENTS, FINISHED, ASSEMBLY_DURATION
+from provenance import Provenance
+from rng import Streams
 from workers import Worker, WorkerPair
 
 
@@ -10,24 +12,52 @@ class Belt:
     A conveyor belt that carries components to be assembled.
 
     It contains a list of slots that can hold components and finished products and a list of worker pairs that can assemble components.
+
+    In active-set mode, a tick only makes work the pairs that can act: those whose slot holds something, those with a worker holding an item to put back, and those
+    with a worker whose assembly finishes in this tick. The assembly countdowns of the other workers advance lazily, their completions being scheduled on a timing
+    wheel of ASSEMBLY_DURATION + 1 buckets.
+
+    With a seed, random numbers come from counter-based streams keyed by (seed, tick, station) instead of the global `random` stream, so the outcome does not
+    depend on the order in which the pairs work, nor on which of them work at all: both modes then give identical results.
     """
     _CHOICES: str = COMPONENTS + EMPTY
     UPPER_SEP: str = '+'
     LOWER_SEP: str = '~'
     DEFAULT_OFFSET: int = 2
 
-    def __init__(self, size: int, pretty_print: bool = False, offset: int = DEFAULT_OFFSET):
+    def __init__(self, size: int, pretty_print: bool = False, offset: int = DEFAULT_OFFSET, active: bool = False, seed: int | None = None,
+                 track: bool = False, stations: list[int] | None = None, mix: str = _CHOICES):
         """
         Create a new belt.
         :param size: the number of slots in the belt.
         :param pretty_print: whether to pretty-print the belt and the workers at each tick.
         :param offset: the number of spaces to add before each line.
+        :param active: whether to make only the pairs that can act work at each tick (active-set mode) or all of them.
+        :param seed: the seed of the keyed random streams, or None for using the global `random` stream.
+        :param track: whether to track the items to measure their dwell and lead times, or not.
+        :param stations: the slots that have a pair of workers, or None for a pair at every slot.
+        :param mix: what may enter the belt at each tick, each character being equally likely. Repeating a character makes it more likely.
         """
+        if stations is None:
+            stations = list(range(size))
+        assert all(0 <= i < size for i in stations) and len(set(stations)) == len(stations), f'Invalid stations: {stations}'
+        assert mix and all(c in self._CHOICES for c in mix), f'Invalid mix: {mix!r}'
         self.slots: list[str] = [EMPTY] * size
         self.touched: list[bool] = [False] * size
-        self.pairs: list[WorkerPair] = [WorkerPair(i, self.slots, self.touched) for i in range(size)]
+        self.provenance: Provenance | None = Provenance(size, 2 * len(stations)) if track else None
+        self.pairs: list[WorkerPair] = [WorkerPair(i, self.slots, self.touched, self.provenance) for i in sorted(stations)]
+        self.mix: str = mix
         self.pretty_print: bool = pretty_print
         self.offset: int = offset
+        self.active: bool = active
+        self.tick: int = 0
+        self.shifts: int = 0
+        self.streams: Streams | None = Streams(seed) if seed is not None else None
+        # Active-set bookkeeping: pairs by slot, slots with a holding worker, assembly completion ticks and the timing wheel of completions
+        self._pair_at: dict[int, WorkerPair] = {p.up.index: p for p in self.pairs}
+        self._holding: set[int] = set()
+        self._due: dict[Worker, int] = {}
+        self._wheel: list[set[Worker]] = [set() for _ in range(ASSEMBLY_DURATION + 1)]
 
     def pre_fill(self):
         """
@@ -46,14 +76,18 @@ class Belt:
         for c in COMPONENTS + FINISHED:
             result[c] = 0
         changes: int = 0
+        if self.active:
+            self._schedule_all()
         self._print(0, ticks)
         for i in range(ticks):
-            in_c, changed, out_c, out_touched = self._tick()
+            in_c, changed, out_c, out_touched = self._tick_active() if self.active else self._tick()
             if out_c != EMPTY and (not out_touched or out_c == FINISHED):
                 result[out_c] += 1
             if changed:
                 changes += 1
             self._print(i + 1, ticks, in_c, out_c, out_touched)
+        if self.active:
+            self._sync()
         return result, changes
 
     def get_in_progress(self) -> dict[str, int]:
@@ -75,15 +109,93 @@ class Belt:
         :return: an (in, chg, out, touched) tuple where 'in' is the component that entered the belt, 'chg' is whether the belt changed, 'out' is the component that left
         the belt, and 'touched' is whether the component that left the belt was touched by a worker.
         """
+        self.tick += 1
         in_c, out_c, out_touched = self._shift()
-        shuffled: list[WorkerPair] = random.sample(self.pairs, len(self.pairs))
+        shuffled: list[WorkerPair] = self._rng().sample(self.pairs, len(self.pairs))
         prioritized: list[WorkerPair] = sorted(shuffled, key=lambda p: p.priority, reverse=True)
         changed: bool = False
         for pair in prioritized:
-            if pair.work():
+            if pair.work(self._rng(pair.up.index)):
                 changed = True
         return in_c, changed, out_c, out_touched
 
+    def _tick_active(self) -> (str, bool, str):
+        """
+        Make the belt tick in active-set mode.
+
+        A pair whose slot is empty, without holding workers and without assembly finishing in this tick would at most count down its assemblies, so it is skipped.
+        :return: an (in, chg, out, touched) tuple, as for _tick.
+        """
+        self.tick += 1
+        in_c, out_c, out_touched = self._shift()
+        t: int = self.tick
+        stations: set[int] = {i for i in self._pair_at if self.slots[i] != EMPTY}
+        stations |= self._holding
+        bucket: set[Worker] = self._wheel[t % len(self._wheel)]
+        for worker in bucket:
+            if self._due.get(worker) == t:  # stale entries are left behind when a completion gets postponed
+                stations.add(worker.index)
+        bucket.clear()
+        pairs: list[WorkerPair] = [self._pair_at[i] for i in stations]
+        for pair in pairs:
+            for worker in (pair.up, pair.down):
+                if worker in self._due:
+                    worker.assembly_remaining = self._due[worker] - t + 1
+        shuffled: list[WorkerPair] = self._rng().sample(pairs, len(pairs))
+        prioritized: list[WorkerPair] = sorted(shuffled, key=lambda p: p.priority, reverse=True)
+        changed: bool = False
+        for pair in prioritized:
+            if pair.work(self._rng(pair.up.index)):
+                changed = True
+            self._schedule(pair)
+        return in_c, changed, out_c, out_touched
+
+    def _schedule(self, pair: WorkerPair):
+        """
+        Update the active-set bookkeeping of a pair after it worked (or before the first tick).
+        :param pair: the pair to update the bookkeeping of.
+        """
+        for worker in (pair.up, pair.down):
+            if worker.state == Worker.State.ASSEMBLING:
+                # The countdown is not decremented if the other worker of the pair acted first, so the completion is recomputed every time the pair works
+                due: int = self.tick + worker.assembly_remaining
+                self._due[worker] = due
+                self._wheel[due % len(self._wheel)].add(worker)
+            else:
+                self._due.pop(worker, None)
+        if pair.up.is_holding or pair.down.is_holding:
+            self._holding.add(pair.up.index)
+        else:
+            self._holding.discard(pair.up.index)
+
+    def _schedule_all(self):
+        """
+        Rebuild the active-set bookkeeping from the state of all the workers, which may have been changed from outside the belt.
+        """
+        self._holding.clear()
+        self._due.clear()
+        for bucket in self._wheel:
+            bucket.clear()
+        for pair in self.pairs:
+            self._schedule(pair)
+
+    def _sync(self):
+        """
+        Bring the lazy assembly countdowns of the workers up to date with the current tick.
+        """
+        for worker, due in self._due.items():
+            worker.assembly_remaining = due - self.tick
+
+    def _rng(self, station: int = -1) -> Any:
+        """
+        Get the source of random numbers for breaking ties in the current tick.
+        :param station: the slot of the pair that breaks ties between its workers, or -1 for ordering the pairs.
+        :return: the `random` module, or the keyed random numbers of the tick and station.
+        """
+        if self.streams is None:
+            return random
+        return self.streams.tie_breaks(self.tick, station)
+
     def _shift(self, refill: bool = True) -> (str, str, bool):
         """
         Shift the belt by one slot.
@@ -97,11 +209,15 @@ class Belt:
             j = i - 1
             self.slots[j] = self.slots[j - 1]
             self.touched[j] = self.touched[j - 1]
+        self.shifts += 1
         if refill:
-            self.slots[0] = random.choice(self._CHOICES)
+            rng: Any = random if self.streams is None else self.streams.arrivals(self.shifts)
+            self.slots[0] = rng.choice(self.mix)
         else:
             self.slots[0] = EMPTY
         self.touched[0] = False
+        if self.provenance is not None:
+            self.provenance.shift(self.tick, self.slots[0])
         return self.slots[0], out, touched
 
     def _print(self, tick: int, ticks: int, inserted: str = EMPTY, generated: str = EMPTY, touched: bool = False):
@@ -115,6 +231,8 @@ class Belt:
         :return:
         """
         if self.pretty_print:
+            if self.active:
+                self._sync()
             if tick == 0:
                 print("")
             w: int = 0
@@ -157,10 +275,10 @@ class Belt:
             :return: list of lists of characters, the maximum width of a worker, and the maximum height of an upper worker.
             """
             ret: list[list[str]] = []
-            max_w_width: int = max(w.get_width(tokens=True) for p in self.pairs for w in (p.up, p.down))
+            max_w_width: int = max((w.get_width(tokens=True) for p in self.pairs for w in (p.up, p.down)), default=0)
             max_w_width = max(1, max_w_width)
-            max_w_upper_height: int = max(p.up.get_height(tokens=True) for p in self.pairs)
-            max_w_lower_height: int = max(p.down.get_height(tokens=True) for p in self.pairs)
+            max_w_upper_height: int = max((p.up.get_height(tokens=True) for p in self.pairs), default=0)
+            max_w_lower_height: int = max((p.down.get_height(tokens=True) for p in self.pairs), default=0)
             width: int = (1 + 1 + max_w_width + 1) * len(self.slots) + 1  # sep+space+token+space for each worker + rightmost sep
             height: int = max_w_upper_height + 1 + 1 + 1 + max_w_lower_height  # upper worker + line + slots + line + lower worker
             for _ in range(height):
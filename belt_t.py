@@ -0,0 +1,85 @@
+import random
+import unittest
+from unittest import mock
+
+from belt import Belt
+from workers import Worker
+from constants import EMPTY, ASSEMBLY_DURATION
+
+
+def _state(belt: Belt) -> tuple:
+    """
+    Get the full state of a belt, for comparisons.
+    """
+    return (tuple(belt.slots), tuple(belt.touched),
+            tuple((w.state, w.left_hand, w.right_hand, w.assembly_remaining) for p in belt.pairs for w in (p.up, p.down)))
+
+
+class TestBelt(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print('Testing Belt class...')
+
+    def setUp(self):
+        self.org_state = random.getstate()
+
+    def tearDown(self):
+        random.setstate(self.org_state)
+
+    def test_active_skips_idle_assembly(self):
+        belt: Belt = Belt(3, active=True)
+        worker: Worker = belt.pairs[1].up
+        worker.left_hand, worker.right_hand = 'A', 'B'
+        worker.state = Worker.State.ASSEMBLING
+        worker.assembly_remaining = ASSEMBLY_DURATION
+        with mock.patch('random.choice', lambda _: EMPTY):
+            belt.work(ASSEMBLY_DURATION - 1)
+            self.assertEqual(worker.state, Worker.State.ASSEMBLING)
+            self.assertEqual(worker.assembly_remaining, 1)
+            belt.work(1)
+        self.assertEqual(worker.state, Worker.State.READY)
+        self.assertEqual(belt.slots[1], 'C')
+
+    def test_active_matches_reference(self):
+        # Pairs never share slots, so only the order of the workers within a pair matters. Without shuffling, both modes consume the same random numbers.
+        with mock.patch('random.sample', lambda population, k: list(population)):
+            for size in (1, 3, 8):
+                for seed in range(1, 11):
+                    belts: list[Belt] = []
+                    for active in (False, True):
+                        random.seed(seed)
+                        belts.append(Belt(size, active=active))
+                    for ticks in (1, 2, 5, 50, 200):
+                        results: list[tuple] = []
+                        for belt in belts:
+                            random.seed(seed + belt.tick)
+                            results.append(belt.work(ticks))
+                        self.assertEqual(results[0], results[1])
+                        self.assertEqual(_state(belts[0]), _state(belts[1]))
+
+    def test_keyed_active_matches_reference(self):
+        for size in (1, 3, 8):
+            for seed in range(1, 11):
+                belts: list[Belt] = [Belt(size, active=active, seed=seed) for active in (False, True)]
+                for belt in belts:
+                    belt.pre_fill()
+                for ticks in (1, 2, 5, 50, 200):
+                    results: list[tuple] = []
+                    for belt in belts:
+                        random.seed(belt.tick)  # the global random stream must not matter
+                        results.append(belt.work(ticks))
+                    self.assertEqual(results[0], results[1])
+                    self.assertEqual(_state(belts[0]), _state(belts[1]))
+
+    def test_keyed_split_run(self):
+        whole: Belt = Belt(5, seed=77)
+        split: Belt = Belt(5, seed=77)
+        whole.work(300)
+        for _ in range(30):
+            split.work(10)
+        self.assertEqual(_state(whole), _state(split))
+
+
+if __name__ == '__main__':
+    unittest.main()
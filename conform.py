@@ -0,0 +1,42 @@
+import argparse
+import logging
+import sys
+
+from conformance import ConformanceHarness, ENGINES
+
+DEFAULT_ITER_NUM: int = 1_000_000
+DEFAULT_SIZE: int = 3
+DEFAULT_SEED: int = 1
+
+if __name__ == '__main__':
+    # Create the parser
+    parser = argparse.ArgumentParser(prog="python conform.py",
+                                     description="Check that a candidate simulation engine matches the reference engine tick by tick and find where they first diverge. "
+                                                 "See ./README.md for details.",
+                                     epilog="If this program does not work, check README.md and also run main_t.py.")
+    parser.add_argument("candidate", choices=sorted(ENGINES), help="Engine to check against the reference.")
+    parser.add_argument("--reference", choices=sorted(ENGINES), default='reference', help="Engine to check against. Default is 'reference'.")
+    parser.add_argument("-n", "--number", type=int, default=DEFAULT_ITER_NUM, help=f"Number of iterations to compare. Default is {DEFAULT_ITER_NUM}.")
+    parser.add_argument("-s", "--size", type=int, default=DEFAULT_SIZE, help=f"Size of the conveyor belt. Default is {DEFAULT_SIZE}.")
+    parser.add_argument("-r", "--rand", type=int, nargs='+', default=[DEFAULT_SEED], help=f"Random seed(s) to compare with. Default is {DEFAULT_SEED}.")
+    parser.add_argument("-f", "--fill", action="store_true", help="Whether to fill the belt with random components initially or not.")
+    parser.add_argument("-u", "--unkeyed", action="store_true", help="Use the global random stream, seeded with the seed, instead of keyed random streams.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Verbose mode, printing INFO logging of the harness.")
+
+    # Parse the arguments
+    args = parser.parse_args()
+
+    # Set logging
+    logging.basicConfig(level=logging.WARNING)
+    if args.verbose:
+        logging.getLogger('conformance').setLevel(logging.INFO)
+
+    # Compare the engines, seed by seed
+    diverged: bool = False
+    for seed in args.rand:
+        harness: ConformanceHarness = ConformanceHarness(ENGINES[args.reference], ENGINES[args.candidate], args.size, seed, args.number,
+                                                         keyed=not args.unkeyed, fill=args.fill)
+        if harness.run() is not None:
+            diverged = True
+        print(harness.report())
+    sys.exit(1 if diverged else 0)
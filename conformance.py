@@ -0,0 +1,196 @@
+import copy
+import hashlib
+import logging
+import random
+from typing import Any, Callable
+
+from belt import Belt
+
+_logger = logging.getLogger(__name__)
+
+#
+# Factories of engines from a belt size and a seed of keyed random streams (None for the global `random` stream). A candidate engine must offer the attributes of
+# Belt that state_hash() reads, and Belt.work().
+#
+ENGINES: dict[str, Callable[[int, int | None], Any]] = {
+    'reference': lambda size, seed: Belt(size, seed=seed),
+    'active': lambda size, seed: Belt(size, seed=seed, active=True),
+    'tracked': lambda size, seed: Belt(size, seed=seed, track=True),
+}
+
+
+def state_hash(belt: Belt) -> str:
+    """
+    Get a compact hash of the state of a belt: slots, touched flags, and the hands, state and countdown of every worker.
+    :param belt: the belt.
+    :return: the hash, as 16 hexadecimal digits.
+    """
+    h = hashlib.blake2b(digest_size=8)
+    h.update(''.join(belt.slots).encode())
+    h.update(bytes(belt.touched))
+    for pair in belt.pairs:
+        for w in (pair.up, pair.down):
+            h.update(f'{w.index}{w.pos}{w.state.value}:{w.left_hand}{w.right_hand}{w.assembly_remaining};'.encode())
+    return h.hexdigest()
+
+
+def describe(belt: Belt) -> str:
+    """
+    Describe the state of a belt, for comparing the states of two engines by eye.
+    :param belt: the belt.
+    :return: one line for the slots, one for the touched flags and one per worker.
+    """
+    lines: list[str] = [f'  slots  : |{"|".join(belt.slots)}|',
+                        f'  touched: |{"|".join("x" if t else " " for t in belt.touched)}|']
+    for pair in belt.pairs:
+        for w in (pair.up, pair.down):
+            lines.append(f'  worker {w.pos}{w.index}: state={w.state.name}, hands=({w.left_hand!r}, {w.right_hand!r}), countdown={w.assembly_remaining}')
+    return '\n'.join(lines)
+
+
+class _Runner:
+    """
+    An engine advancing tick by tick, with its own state of the global `random` stream so that two engines can be interleaved.
+
+    It also accumulates the outputs of the engine, so that a divergence of the outputs shows even after the states of the belts become the same again.
+    """
+
+    def __init__(self, factory: Callable[[int, int | None], Any], size: int, seed: int, keyed: bool, fill: bool):
+        """
+        Create an engine.
+        :param factory: the factory of the engine.
+        :param size: the size of the belt.
+        :param seed: the seed.
+        :param keyed: whether the engine uses keyed random streams or the global `random` stream.
+        :param fill: whether to pre-fill the belt or not.
+        """
+        saved: object = random.getstate()
+        random.seed(seed)
+        self.belt: Any = factory(size, seed if keyed else None)
+        if fill:
+            self.belt.pre_fill()
+        self.random_state: object = random.getstate()
+        self.tick: int = 0
+        self.outputs: dict[str, int] = {}
+        self.changes: int = 0
+        random.setstate(saved)
+
+    def advance_to(self, tick: int):
+        """
+        Make the engine work until a tick.
+        :param tick: the tick to stop after; not before the current one.
+        """
+        assert tick >= self.tick
+        saved: object = random.getstate()
+        random.setstate(self.random_state)
+        result, changes = self.belt.work(tick - self.tick)
+        for c, n in result.items():
+            self.outputs[c] = self.outputs.get(c, 0) + n
+        self.changes += changes
+        self.random_state = random.getstate()
+        random.setstate(saved)
+        self.tick = tick
+
+    def fingerprint(self) -> tuple[str, list[tuple[str, int]], int]:
+        """
+        Get what must be the same in two conforming engines at the same tick.
+        :return: the state hash of the belt, the outputs and the number of changes so far.
+        """
+        return state_hash(self.belt), sorted(self.outputs.items()), self.changes
+
+
+class ConformanceHarness:
+    """
+    Run a reference engine and a candidate engine on the same seed and find the first tick after which their states differ.
+
+    The state hashes and the outputs so far are compared at exponentially spaced checkpoints (ticks 0, 1, 2, 4, 8, ...). Once two hashes differ, the ticks between the last matching
+    checkpoint and the first differing one are bisected, replaying both engines from copies taken at the last matching tick.
+    """
+
+    def __init__(self, reference: Callable[[int, int | None], Any], candidate: Callable[[int, int | None], Any], size: int, seed: int, ticks: int,
+                 keyed: bool = True, fill: bool = False):
+        """
+        Create a harness.
+        :param reference: the factory of the reference engine.
+        :param candidate: the factory of the candidate engine.
+        :param size: the size of the belt.
+        :param seed: the seed of both engines.
+        :param ticks: the number of ticks to run for.
+        :param keyed: whether the engines use keyed random streams (True) or the global `random` stream, seeded with the seed (False).
+        :param fill: whether to pre-fill the belts or not.
+        """
+        assert ticks > 0
+        self.reference: Callable[[int, int | None], Any] = reference
+        self.candidate: Callable[[int, int | None], Any] = candidate
+        self.size: int = size
+        self.seed: int = seed
+        self.ticks: int = ticks
+        self.keyed: bool = keyed
+        self.fill: bool = fill
+        self.checkpoints: int = 0
+        self.divergence: int | None = None
+        self.states: list[tuple[str, str]] = []
+
+    def run(self) -> int | None:
+        """
+        Run both engines and look for a divergence.
+        :return: the first tick after which the states differ (0 for the initial state), or None if they never do.
+        """
+        runners: list[_Runner] = [_Runner(f, self.size, self.seed, self.keyed, self.fill) for f in (self.reference, self.candidate)]
+        last_good: list[_Runner] = []
+        checkpoint: int = 0
+        while True:
+            for r in runners:
+                r.advance_to(checkpoint)
+            self.checkpoints += 1
+            if not self._same(runners):
+                break
+            if checkpoint == self.ticks:
+                _logger.info(f'No divergence in {self.ticks} ticks ({self.checkpoints} checkpoints)')
+                return None
+            last_good = copy.deepcopy(runners)
+            checkpoint = min(self.ticks, max(1, 2 * checkpoint))
+        if not last_good:
+            self.divergence = 0
+            self.states = [(describe(runners[0].belt), describe(runners[1].belt))]
+            return self.divergence
+        # Bisect between the last matching tick (lo) and the first differing one (hi)
+        lo: int = last_good[0].tick
+        hi: int = checkpoint
+        while hi - lo > 1:
+            mid: int = (lo + hi) // 2
+            probe: list[_Runner] = copy.deepcopy(last_good)
+            for r in probe:
+                r.advance_to(mid)
+            if self._same(probe):
+                lo, last_good = mid, probe
+            else:
+                hi = mid
+        _logger.info(f'First divergence after tick {hi}, found with {self.checkpoints} checkpoints')
+        self.divergence = hi
+        before: list[str] = [describe(r.belt) for r in last_good]
+        for r in last_good:
+            r.advance_to(hi)
+        self.states = [(before[0], before[1]), (describe(last_good[0].belt), describe(last_good[1].belt))]
+        return self.divergence
+
+    def report(self) -> str:
+        """
+        Describe the outcome of the last run.
+        :return: the outcome and, after a divergence, the states of both engines just before and just after it.
+        """
+        if self.divergence is None:
+            return f'No divergence in {self.ticks} ticks (seed {self.seed}, {self.checkpoints} checkpoints)'
+        lines: list[str] = [f'First divergence after tick {self.divergence} (seed {self.seed})']
+        ticks: list[int] = [self.divergence - 1, self.divergence] if len(self.states) > 1 else [self.divergence]
+        for tick, (ref, cand) in zip(ticks, self.states):
+            lines += [f'Reference after tick {tick}:', ref, f'Candidate after tick {tick}:', cand]
+        return '\n'.join(lines)
+
+    def _same(self, runners: list[_Runner]) -> bool:
+        """
+        Compare the state hashes and the outputs of the two engines.
+        :param runners: the reference and the candidate engines, at the same tick.
+        :return: True if the hashes and the outputs are the same, False otherwise.
+        """
+        return runners[0].fingerprint() == runners[1].fingerprint()
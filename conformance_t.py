@@ -0,0 +1,54 @@
+import unittest
+
+from belt import Belt
+from conformance import ConformanceHarness, ENGINES, state_hash
+from constants import FINISHED
+
+
+class _Faulty(Belt):
+    """
+    A belt that swaps what is on its last slot for something else at a given tick.
+    """
+    FAULT_TICK: int = 777
+
+    def _tick(self) -> (str, bool, str):
+        result = super()._tick()
+        if self.tick == self.FAULT_TICK:
+            self.slots[-1] = 'A' if self.slots[-1] == FINISHED else FINISHED
+        return result
+
+
+class TestConformanceHarness(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print('Testing ConformanceHarness class...')
+
+    def test_state_hash(self):
+        a: Belt = Belt(4, seed=1)
+        b: Belt = Belt(4, seed=1)
+        self.assertEqual(state_hash(a), state_hash(b))
+        b.pairs[2].down.assembly_remaining = 3
+        self.assertNotEqual(state_hash(a), state_hash(b))
+
+    def test_conforming_engines(self):
+        for candidate in ('active', 'tracked'):
+            harness: ConformanceHarness = ConformanceHarness(ENGINES['reference'], ENGINES[candidate], 5, 3, 3000, fill=True)
+            self.assertIsNone(harness.run())
+            self.assertEqual(harness.checkpoints, 14)
+
+    def test_first_divergence(self):
+        harness: ConformanceHarness = ConformanceHarness(ENGINES['reference'], lambda size, seed: _Faulty(size, seed=seed), 5, 3, 5000)
+        self.assertEqual(harness.run(), _Faulty.FAULT_TICK)
+        report: str = harness.report()
+        self.assertIn(f'First divergence after tick {_Faulty.FAULT_TICK}', report)
+        self.assertIn(f'Candidate after tick {_Faulty.FAULT_TICK - 1}:', report)
+
+    def test_unkeyed_active_diverges(self):
+        # With the global random stream, the active-set mode shuffles fewer pairs, so it soon draws different random numbers
+        harness: ConformanceHarness = ConformanceHarness(ENGINES['reference'], ENGINES['active'], 5, 3, 3000, keyed=False)
+        self.assertIsNotNone(harness.run())
+
+
+if __name__ == '__main__':
+    unittest.main()
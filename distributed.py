@@ -0,0 +1,315 @@
+#
+# Distributed parameter sweeps: a coordinator splits a sweep over belt sizes, ticks and seeds into chunks and hands them out over TCP to worker processes, on
+# any number of hosts. Messages are JSON objects, one per line:
+# - worker -> coordinator: {"type": "ready"} once connected (or the last result not answered yet, after reconnecting), then {"type": "result", "id": <chunk>, "stats": [[size, ticks, measure, count, mean, m2], ...]}
+# - coordinator -> worker: {"type": "chunk", "id": <chunk>, "tasks": [[size, ticks, seed], ...]} or {"type": "done"}
+# A worker asks for its next chunk by sending the result of the previous one. The chunk of a worker that disconnects or times out is handed out again; a worker
+# whose connection is lost connects again until the coordinator says it is done.
+#
+import json
+import logging
+import multiprocessing
+import socket
+import socketserver
+import threading
+import time
+from collections import deque
+
+from belt import Belt
+from constants import COMPONENTS
+from estimators import MEASURES, RunningStats
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_PORT: int = 5555
+DEFAULT_CHUNK: int = 10
+MAX_BACK_OFF: float = 2.0  # the longest wait between two attempts to connect, in seconds
+#
+# TCP keepalive, so that a host that disappears without closing its connections is noticed after about KEEPALIVE_IDLE + KEEPALIVE_INTERVAL * KEEPALIVE_COUNT
+# seconds of silence, even while waiting for a chunk or a result without a timeout.
+#
+KEEPALIVE_IDLE: int = 30
+KEEPALIVE_INTERVAL: int = 10
+KEEPALIVE_COUNT: int = 3
+
+
+def simulate(size: int, ticks: int, seed: int) -> dict[str, int]:
+    """
+    Run one simulation of a sweep. As the random streams are keyed by the seed, the outcome does not depend on where it runs.
+    :param size: the size of the conveyor belt.
+    :param ticks: the number of ticks.
+    :param seed: the seed of the keyed random streams.
+    :return: the number of finished products and of untouched components (generated or still on the belt).
+    """
+    b: Belt = Belt(size, active=True, seed=seed)
+    result, _ = b.work(ticks)
+    in_progress: dict[str, int] = b.get_in_progress()
+    for c in COMPONENTS:
+        result[c] += in_progress[c]
+    return result
+
+
+def run_chunk(tasks: list[list[int]]) -> list[list]:
+    """
+    Run the simulations of a chunk and summarise them.
+    :param tasks: the (size, ticks, seed) triples of the simulations.
+    :return: the (size, ticks, measure, count, mean, m2) summaries, one per measure and (size, ticks) group.
+    """
+    groups: dict[tuple[int, int], dict[str, RunningStats]] = {}
+    for size, ticks, seed in tasks:
+        stats: dict[str, RunningStats] = groups.setdefault((size, ticks), {m: RunningStats() for m in MEASURES})
+        result: dict[str, int] = simulate(size, ticks, seed)
+        for m in MEASURES:
+            stats[m].add(result[m])
+    return [[size, ticks, m, *s.to_tuple()] for (size, ticks), stats in groups.items() for m, s in stats.items()]
+
+
+def _send(sock: socket.socket, message: dict):
+    """
+    Send a message.
+    :param sock: the socket to send through.
+    :param message: the message.
+    """
+    sock.sendall(json.dumps(message).encode() + b'\n')
+
+
+def _keepalive(sock: socket.socket):
+    """
+    Turn on TCP keepalive on a socket, with the probing intervals above where the platform allows setting them.
+    :param sock: the socket.
+    """
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    idle: int | None = getattr(socket, 'TCP_KEEPIDLE', getattr(socket, 'TCP_KEEPALIVE', None))  # TCP_KEEPALIVE on macOS
+    for option, value in ((idle, KEEPALIVE_IDLE), (getattr(socket, 'TCP_KEEPINTVL', None), KEEPALIVE_INTERVAL),
+                          (getattr(socket, 'TCP_KEEPCNT', None), KEEPALIVE_COUNT)):
+        if option is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, option, value)
+
+
+def _connect(host: str, port: int, timeout: float) -> socket.socket:
+    """
+    Connect to a coordinator, trying again with exponential back-off while it cannot be reached.
+    :param host: the host of the coordinator.
+    :param port: the port of the coordinator.
+    :param timeout: how long to keep trying, in seconds.
+    :return: the connected socket.
+    """
+    deadline: float = time.monotonic() + timeout
+    delay: float = 0.1
+    while True:
+        try:
+            sock: socket.socket = socket.create_connection((host, port))
+            _keepalive(sock)
+            return sock
+        except OSError:
+            if time.monotonic() + delay > deadline:
+                raise
+            time.sleep(delay)
+            delay = min(2 * delay, MAX_BACK_OFF)
+
+
+def run_worker(host: str, port: int, connect_timeout: float = 10.0) -> int:
+    """
+    Run chunks of simulations for a coordinator until it has none left.
+
+    A connection that closes or fails before the coordinator says it is done is opened again, resending the result that was not answered yet: the coordinator
+    may have given up on the chunk while it was running. The worker stops when the coordinator cannot be reached for connect_timeout seconds, e.g. as the sweep
+    ended while it was running a chunk that another worker completed first.
+    :param host: the host of the coordinator.
+    :param port: the port of the coordinator.
+    :param connect_timeout: how long to keep trying to connect, in seconds, e.g. while the coordinator starts or after losing the connection.
+    :return: the number of chunks run.
+    """
+    chunks: int = 0
+    unanswered: dict | None = None  # the last result sent, until the coordinator answers it
+    while True:
+        try:
+            sock: socket.socket = _connect(host, port, connect_timeout)
+        except OSError as e:
+            # Most likely the sweep ended while this worker was running a chunk handed out again to another worker
+            _logger.info(f'Coordinator unreachable ({e!r}); worker stops after running {chunks} chunks')
+            return chunks
+        try:
+            with sock, sock.makefile('rb') as reader:
+                _send(sock, unanswered or {'type': 'ready'})
+                for line in reader:
+                    unanswered = None
+                    message: dict = json.loads(line)
+                    if message['type'] == 'done':
+                        _logger.info(f'Worker ran {chunks} chunks')
+                        return chunks
+                    assert message['type'] == 'chunk', f'Unexpected message: {message}'
+                    unanswered = {'type': 'result', 'id': message['id'], 'stats': run_chunk(message['tasks'])}
+                    chunks += 1
+                    _send(sock, unanswered)
+            _logger.info('Connection closed by the coordinator; reconnecting')
+        except OSError as e:
+            _logger.info(f'Connection with the coordinator failed: {e!r}; reconnecting')
+
+
+class Coordinator:
+    """
+    Split a sweep into chunks, hand them out to the workers that connect and merge their statistics as they come.
+    """
+
+    def __init__(self, sizes: list[int], ticks: list[int], seeds: list[int], chunk: int = DEFAULT_CHUNK, host: str = 'localhost', port: int = DEFAULT_PORT,
+                 timeout: float | None = None):
+        """
+        Create a coordinator.
+        :param sizes: the sizes of the conveyor belt to sweep.
+        :param ticks: the numbers of ticks to sweep.
+        :param seeds: the seeds to run every (size, ticks) combination with.
+        :param chunk: the number of simulations per chunk.
+        :param host: the interface to listen on, e.g. '0.0.0.0' for all of them.
+        :param port: the port to listen on; 0 for any free port.
+        :param timeout: how long to wait for the result of a chunk before giving up on the worker, in seconds, or None for waiting as long as it is connected
+        (a lost host is still noticed through TCP keepalive).
+        """
+        assert chunk > 0
+        tasks: list[list[int]] = [[s, t, seed] for s in sizes for t in ticks for seed in seeds]
+        self.chunks: dict[int, list[list[int]]] = {i: tasks[j:j + chunk] for i, j in enumerate(range(0, len(tasks), chunk))}
+        self.timeout: float | None = timeout
+        self.stats: dict[tuple[int, int], dict[str, RunningStats]] = {(s, t): {m: RunningStats() for m in MEASURES} for s in sizes for t in ticks}
+        self.requeued: int = 0
+        self._pending: deque[int] = deque(self.chunks)
+        self._done: set[int] = set()
+        self._cond: threading.Condition = threading.Condition()
+        self._server: socketserver.ThreadingTCPServer = socketserver.ThreadingTCPServer((host, port), self._handler(), bind_and_activate=False)
+        self._server.allow_reuse_address = True
+        self._server.daemon_threads = True
+        self._server.server_bind()
+        self._server.server_activate()
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """
+        Get the address the coordinator listens on.
+        :return: the (host, port) pair; the port is the actual one when created with port 0.
+        """
+        return self._server.server_address[:2]
+
+    @property
+    def finished(self) -> bool:
+        """
+        Check whether all chunks have results.
+        :return: True if all chunks have results, False otherwise.
+        """
+        return len(self._done) == len(self.chunks)
+
+    def run(self, local: int = 0) -> dict[tuple[int, int], dict[str, RunningStats]]:
+        """
+        Serve the chunks until all of them have results.
+        :param local: the number of worker processes to start on this host (the local stand-in for remote workers).
+        :return: the statistics per (size, ticks) group and measure.
+        """
+        server: threading.Thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        server.start()
+        host, port = self.address
+        if host in ('0.0.0.0', '::'):
+            host = 'localhost'  # local workers cannot connect to the wildcard address on all platforms
+        processes: list[multiprocessing.Process] = [multiprocessing.Process(target=run_worker, args=(host, port), daemon=True) for _ in range(local)]
+        for p in processes:
+            p.start()
+        try:
+            with self._cond:
+                while not self.finished:
+                    self._cond.wait()
+        finally:
+            self._server.shutdown()
+            self._server.server_close()
+            for p in processes:
+                p.join(timeout=5.0)
+        _logger.info(f'Sweep of {len(self.chunks)} chunks done, {self.requeued} of them re-queued')
+        return self.stats
+
+    def _next(self) -> int | None:
+        """
+        Take the next chunk to hand out, waiting for chunks of lost workers if needed.
+        :return: the chunk, or None if all chunks have results.
+        """
+        with self._cond:
+            while True:
+                # Re-queued chunks may have got a late result in the meantime
+                while self._pending and self._pending[0] in self._done:
+                    self._pending.popleft()
+                if self._pending:
+                    return self._pending.popleft()
+                if self.finished:
+                    return None
+                self._cond.wait()
+
+    def _requeue(self, chunk: int):
+        """
+        Hand a chunk out again, as its worker is lost.
+        :param chunk: the chunk.
+        """
+        with self._cond:
+            if chunk not in self._done:
+                _logger.warning(f'Worker lost; re-queueing chunk {chunk}')
+                self._pending.appendleft(chunk)
+                self.requeued += 1
+                self._cond.notify_all()
+
+    def _merge(self, chunk: int, stats: list[list]):
+        """
+        Merge the result of a chunk, unless another worker delivered it first.
+        :param chunk: the chunk.
+        :param stats: the (size, ticks, measure, count, mean, m2) summaries of the chunk.
+        :raise ValueError: if a summary is malformed or does not belong to the sweep, in which case nothing is merged.
+        """
+        # Check all the summaries first, so that a malformed one leaves the statistics untouched
+        updates: list[tuple[RunningStats, RunningStats]] = []
+        for row in stats:
+            if not isinstance(row, list) or len(row) != 6:
+                raise ValueError(f'Malformed summary: {row!r}')
+            size, ticks, m, *t = row
+            try:
+                updates.append((self.stats[(size, ticks)][m], RunningStats.from_tuple(t)))
+            except (KeyError, TypeError, ValueError):
+                raise ValueError(f'Malformed summary: {row!r}') from None
+        with self._cond:
+            if chunk in self._done:
+                return
+            for s, other in updates:
+                s.merge(other)
+            self._done.add(chunk)
+            _logger.info(f'Chunk {chunk} done ({len(self._done)} of {len(self.chunks)})')
+            self._cond.notify_all()
+
+    def _handler(self) -> type:
+        """
+        Create the class handling the connection of a worker.
+        :return: the handler class, bound to this coordinator.
+        """
+        coordinator: Coordinator = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                _keepalive(self.request)
+                self.request.settimeout(coordinator.timeout)
+                chunk: int | None = None
+                try:
+                    message: dict = json.loads(self.rfile.readline())
+                    assert message['type'] in ('ready', 'result'), f'Unexpected message: {message}'
+                    if message['type'] == 'result':
+                        assert message['id'] in coordinator.chunks, f'Unexpected message: {message}'
+                        coordinator._merge(message['id'], message['stats'])
+                    while True:
+                        chunk = coordinator._next()
+                        if chunk is None:
+                            _send(self.request, {'type': 'done'})
+                            return
+                        _send(self.request, {'type': 'chunk', 'id': chunk, 'tasks': coordinator.chunks[chunk]})
+                        line: bytes = self.rfile.readline()
+                        if not line:
+                            raise ConnectionError('Worker disconnected')
+                        message = json.loads(line)
+                        assert message['type'] == 'result' and message['id'] == chunk, f'Unexpected message: {message}'
+                        coordinator._merge(chunk, message['stats'])
+                        chunk = None
+                except Exception as e:  # whatever went wrong, the chunk must be handed out again
+                    _logger.warning(f'Connection with worker {self.client_address} failed: {e!r}')
+                    if chunk is not None:
+                        coordinator._requeue(chunk)
+
+        return Handler
@@ -0,0 +1,122 @@
+import json
+import socket
+import threading
+import time
+import unittest
+
+from constants import FINISHED
+from distributed import Coordinator, _keepalive, run_chunk, run_worker
+from estimators import MEASURES
+
+
+class TestDistributed(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print('Testing Coordinator class...')
+
+    def setUp(self):
+        self.coordinator: Coordinator = Coordinator([2, 4], [50], list(range(1, 13)), chunk=5, port=0, timeout=10.0)
+        self.expected: dict[tuple[int, int], dict[str, tuple]] = {}
+        for size, ticks, m, count, mean, _ in run_chunk([[s, 50, seed] for s in (2, 4) for seed in range(1, 13)]):
+            self.expected.setdefault((size, ticks), {})[m] = (count, mean)
+
+    def _check(self, stats: dict):
+        for group, expected in self.expected.items():
+            for m in MEASURES:
+                self.assertEqual(stats[group][m].count, expected[m][0])
+                self.assertAlmostEqual(stats[group][m].mean, expected[m][1])
+
+    def _run_in_background(self) -> tuple[threading.Thread, dict]:
+        result: dict = {}
+        thread: threading.Thread = threading.Thread(target=lambda: result.update(self.coordinator.run()))
+        thread.start()
+        return thread, result
+
+    def test_sweep_with_two_workers(self):
+        thread, result = self._run_in_background()
+        host, port = self.coordinator.address
+        workers: list[threading.Thread] = [threading.Thread(target=run_worker, args=(host, port)) for _ in range(2)]
+        for w in workers:
+            w.start()
+        for w in workers + [thread]:
+            w.join(timeout=60)
+        self.assertEqual(self.coordinator.requeued, 0)
+        self._check(result)
+
+    def test_lost_worker(self):
+        thread, result = self._run_in_background()
+        host, port = self.coordinator.address
+        # A worker that takes a chunk and disconnects without a result
+        with socket.create_connection((host, port)) as sock, sock.makefile('rb') as reader:
+            sock.sendall(json.dumps({'type': 'ready'}).encode() + b'\n')
+            self.assertEqual(json.loads(reader.readline())['type'], 'chunk')
+        run_worker(host, port)
+        thread.join(timeout=60)
+        self.assertEqual(self.coordinator.requeued, 1)
+        self._check(result)
+
+    def test_timeout_shorter_than_chunk(self):
+        # Every chunk times out and is re-queued; the worker reconnects and its late results still count
+        self.coordinator._server.server_close()
+        self.coordinator = Coordinator([10], [500], list(range(1, 5)), chunk=2, port=0, timeout=0.02)
+        thread, result = self._run_in_background()
+        host, port = self.coordinator.address
+        self.assertEqual(run_worker(host, port), 2)
+        thread.join(timeout=60)
+        self.assertTrue(self.coordinator.finished)
+        self.assertGreaterEqual(self.coordinator.requeued, 1)
+        count, mean, _ = run_chunk([[10, 500, seed] for seed in range(1, 5)])[0][3:]
+        self.assertEqual(result[(10, 500)][FINISHED].count, count)
+        self.assertAlmostEqual(result[(10, 500)][FINISHED].mean, mean)
+
+    def test_sweep_ends_during_duplicate_chunk(self):
+        # The worker's chunk times out and is re-queued; another worker delivers it, so the coordinator finishes while the first worker still runs it
+        self.coordinator._server.server_close()
+        self.coordinator = Coordinator([10], [2000], [1, 2], chunk=2, port=0, timeout=0.02)
+        stats: list[list] = run_chunk([[10, 2000, 1], [10, 2000, 2]])
+        thread, result = self._run_in_background()
+        host, port = self.coordinator.address
+        chunks: list[int] = []
+        worker: threading.Thread = threading.Thread(target=lambda: chunks.append(run_worker(host, port, connect_timeout=0.5)))
+        worker.start()
+        deadline: float = time.monotonic() + 10.0
+        while self.coordinator.requeued == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        with socket.create_connection((host, port)) as sock, sock.makefile('rb') as reader:
+            sock.sendall(json.dumps({'type': 'result', 'id': 0, 'stats': stats}).encode() + b'\n')
+            self.assertEqual(json.loads(reader.readline())['type'], 'done')
+        thread.join(timeout=60)
+        self.assertTrue(self.coordinator.finished)
+        worker.join(timeout=60)
+        self.assertEqual(chunks, [1])
+        self.assertEqual(result[(10, 2000)][FINISHED].count, 2)
+
+    def test_no_coordinator(self):
+        port: int = self.coordinator.address[1]
+        self.coordinator._server.server_close()
+        self.assertEqual(run_worker('localhost', port, connect_timeout=0.2), 0)
+
+    def test_malformed_result(self):
+        stats: list[list] = run_chunk([[2, 50, 1]])
+        for bad in ([[3, 50, FINISHED, 1, 1.0, 0.0]], [[2, 50, FINISHED, 1, 1.0]], [[2, 50, FINISHED, 1, 'x', 0.0]], [None]):
+            with self.assertRaises(ValueError):
+                self.coordinator._merge(0, stats + bad)
+        self.assertEqual(self.coordinator.stats[(2, 50)][FINISHED].count, 0)
+        self.assertFalse(self.coordinator._done)
+        self.coordinator._server.server_close()
+
+    def test_keepalive(self):
+        with socket.socket() as sock:
+            _keepalive(sock)
+            self.assertNotEqual(sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE), 0)
+        self.coordinator._server.server_close()
+
+    def test_local_processes(self):
+        stats: dict = self.coordinator.run(local=2)
+        self._check(stats)
+        self.assertEqual(stats[(4, 50)][FINISHED].count, 12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,365 @@
+import logging
+import math
+import random
+from statistics import NormalDist
+
+from belt import Belt
+from constants import COMPONENTS, FINISHED
+
+_logger = logging.getLogger(__name__)
+
+#
+# Names of the measures estimated from each replica: the finished products plus the untouched components.
+#
+MEASURES: str = FINISHED + COMPONENTS
+
+
+class RunningStats:
+    """
+    Running mean and variance of a series of observations, updated one observation at a time (Welford's algorithm).
+    """
+
+    def __init__(self):
+        """
+        Create an empty series of observations.
+        """
+        self.count: int = 0
+        self.mean: float = 0.0
+        self._m2: float = 0.0
+
+    def __str__(self):
+        return f'{self.mean:.4f} (n={self.count}, s.e.={self.std_error:.4f})'
+
+    def add(self, x: float):
+        """
+        Add an observation to the series.
+        :param x: the observation to add.
+        """
+        self.count += 1
+        delta: float = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+
+    def merge(self, other: 'RunningStats'):
+        """
+        Add all the observations of another series to this one (Chan's parallel algorithm).
+        :param other: the other series.
+        """
+        if other.count == 0:
+            return
+        n: int = self.count + other.count
+        delta: float = other.mean - self.mean
+        self.mean += delta * other.count / n
+        self._m2 += other._m2 + delta * delta * self.count * other.count / n
+        self.count = n
+
+    def to_tuple(self) -> tuple[int, float, float]:
+        """
+        Get the summary of the series, e.g. for sending it to another process.
+        :return: a (count, mean, sum of squared deviations) tuple.
+        """
+        return self.count, self.mean, self._m2
+
+    @classmethod
+    def from_tuple(cls, t: tuple[int, float, float]) -> 'RunningStats':
+        """
+        Rebuild a series from its summary.
+        :param t: a (count, mean, sum of squared deviations) tuple, as returned by to_tuple().
+        :return: the series.
+        """
+        result: RunningStats = cls()
+        result.count, result.mean, result._m2 = int(t[0]), float(t[1]), float(t[2])
+        return result
+
+    @property
+    def variance(self) -> float:
+        """
+        Get the sample variance of the observations.
+        :return: the sample variance, or infinity if there are fewer than two observations.
+        """
+        if self.count < 2:
+            return math.inf
+        return self._m2 / (self.count - 1)
+
+    @property
+    def std_error(self) -> float:
+        """
+        Get the standard error of the mean.
+        :return: the standard error of the mean, or infinity if there are fewer than two observations.
+        """
+        if self.count < 2:
+            return math.inf
+        return math.sqrt(self.variance / self.count)
+
+    def half_width(self, confidence: float) -> float:
+        """
+        Get the half-width of the confidence interval of the mean, using the Student t distribution with count - 1 degrees of freedom.
+        :param confidence: the confidence level, e.g. 0.95.
+        :return: the half-width of the confidence interval, or infinity if there are fewer than two observations.
+        """
+        if self.count < 2:
+            return math.inf
+        return t_value(confidence, self.count - 1) * self.std_error
+
+
+def z_value(confidence: float) -> float:
+    """
+    Get the two-sided critical value of the standard normal distribution.
+    :param confidence: the confidence level, e.g. 0.95.
+    :return: the critical value, e.g. 1.96 for 0.95.
+    """
+    assert 0.0 < confidence < 1.0
+    return NormalDist().inv_cdf(0.5 + confidence / 2.0)
+
+
+#
+# Beyond this many degrees of freedom, the critical values of the Student t distribution come from an expansion around the normal ones instead of the exact
+# distribution function, whose cost grows with the degrees of freedom.
+#
+T_EXACT_DF: int = 100
+
+
+def _t_confidence(theta: float, df: int) -> float:
+    """
+    Get the probability that a Student t variable lies within ±sqrt(df) * tan(theta), from the closed form for integer degrees of freedom (Abramowitz and
+    Stegun 26.7.3 and 26.7.4).
+    :param theta: the angle, in [0, pi/2).
+    :param df: the number of degrees of freedom.
+    :return: the probability.
+    """
+    sin: float = math.sin(theta)
+    cos: float = math.cos(theta)
+    total: float = 0.0
+    if df % 2:
+        term: float = cos
+        for j in range(1, df - 1, 2):
+            total += term
+            term *= cos * cos * (j + 1) / (j + 2)
+        return 2.0 / math.pi * (theta + sin * total)
+    term: float = 1.0
+    for j in range(2, df + 1, 2):
+        total += term
+        term *= cos * cos * (j - 1) / j
+    return sin * total
+
+
+def t_value(confidence: float, df: int) -> float:
+    """
+    Get the two-sided critical value of the Student t distribution.
+    :param confidence: the confidence level, e.g. 0.95.
+    :param df: the number of degrees of freedom, e.g. the number of observations minus one.
+    :return: the critical value, e.g. 2.228 for 0.95 and 10 degrees of freedom.
+    """
+    assert 0.0 < confidence < 1.0 and df > 0
+    if df > T_EXACT_DF:
+        # Cornish-Fisher expansion (Abramowitz and Stegun 26.7.5)
+        x: float = z_value(confidence)
+        g: list[float] = [(x ** 3 + x) / 4,
+                          (5 * x ** 5 + 16 * x ** 3 + 3 * x) / 96,
+                          (3 * x ** 7 + 19 * x ** 5 + 17 * x ** 3 - 15 * x) / 384,
+                          (79 * x ** 9 + 776 * x ** 7 + 1482 * x ** 5 - 1920 * x ** 3 - 945 * x) / 92160]
+        return x + sum(gi / df ** (i + 1) for i, gi in enumerate(g))
+    # Bisection on the angle, as the probability grows with it
+    lo: float = 0.0
+    hi: float = math.pi / 2
+    for _ in range(60):
+        mid: float = (lo + hi) / 2
+        if _t_confidence(mid, df) < confidence:
+            lo = mid
+        else:
+            hi = mid
+    return math.sqrt(df) * math.tan((lo + hi) / 2)
+
+
+class SequentialEstimator:
+    """
+    Run independent replicas of the conveyor belt in batches until the confidence intervals of all measures are narrow enough, or until the compute budget is spent.
+    """
+    DEFAULT_CONFIDENCE: float = 0.95
+    DEFAULT_BATCH: int = 10
+    DEFAULT_BUDGET: int = 10_000_000
+    MIN_REPLICAS: int = 10  # the pilot: the stopping rule is not checked before this many replicas, as fewer give an unreliable variance estimate
+
+    def __init__(self, size: int, ticks: int, fill: bool = False, abs_precision: float | None = None, rel_precision: float | None = None,
+                 confidence: float = DEFAULT_CONFIDENCE, batch: int = DEFAULT_BATCH, budget: int = DEFAULT_BUDGET, active: bool = False,
+                 keyed: bool = False):
+        """
+        Create a sequential estimator.
+        :param size: the size of the conveyor belt of each replica.
+        :param ticks: the number of ticks each replica works for.
+        :param fill: whether to pre-fill the belt of each replica or not.
+        :param abs_precision: the target half-width of the confidence intervals, in the units of the measures.
+        :param rel_precision: the target half-width of the confidence intervals, as a fraction of the absolute value of the means.
+        :param confidence: the confidence level of the confidence intervals.
+        :param batch: how many replicas to run between two checks of the stopping rule, after the first MIN_REPLICAS ones.
+        :param budget: the maximum number of ticks to spend over all replicas.
+        :param active: whether to run the replicas in active-set mode or not.
+        :param keyed: whether to run each replica with keyed random streams, seeded from the global `random` stream, or not.
+        """
+        assert abs_precision is not None or rel_precision is not None
+        assert size > 0 and ticks > 0 and batch > 0
+        self.size: int = size
+        self.ticks_per_replica: int = ticks
+        self.fill: bool = fill
+        self.abs_precision: float | None = abs_precision
+        self.rel_precision: float | None = rel_precision
+        self.confidence: float = confidence
+        self.batch: int = batch
+        self.budget: int = budget
+        self.active: bool = active
+        self.keyed: bool = keyed
+        self.stats: dict[str, RunningStats] = {m: RunningStats() for m in MEASURES}
+        self.ticks: int = 0
+        self.converged: bool = False
+
+    @property
+    def replicas(self) -> int:
+        """
+        Get the number of replicas run so far.
+        :return: the number of replicas run so far.
+        """
+        return self.stats[FINISHED].count
+
+    def run(self) -> bool:
+        """
+        Run a pilot of MIN_REPLICAS replicas (or one batch, if larger), then batches of replicas until the stopping rule is met or the budget is spent.
+        :return: True if the target precision was reached, possibly with the last replicas the budget allowed, False otherwise.
+        """
+        while not self.converged:
+            target: int = max(self.MIN_REPLICAS, self.replicas + self.batch)
+            while self.replicas < target:
+                if self.ticks + self.ticks_per_replica > self.budget:
+                    # The replicas run since the last check may have been enough
+                    self.converged = self.replicas >= self.MIN_REPLICAS and self._is_precise()
+                    _logger.info(f'Budget of {self.budget} ticks exhausted after {self.replicas} replicas')
+                    return self.converged
+                self._replica()
+            self.converged = self._is_precise()
+            _logger.info(f'After {self.replicas} replicas: ' + ', '.join(f'{m}={s.mean:.4f}±{s.half_width(self.confidence):.4f}' for m, s in self.stats.items()))
+        return True
+
+    def _replica(self):
+        """
+        Run one replica of the conveyor belt and record its measures.
+        """
+        b: Belt = Belt(self.size, active=self.active, seed=random.getrandbits(64) if self.keyed else None)
+        if self.fill:
+            b.pre_fill()
+        result, _ = b.work(self.ticks_per_replica)
+        in_progress: dict[str, int] = b.get_in_progress()
+        self.stats[FINISHED].add(result[FINISHED])
+        for c in COMPONENTS:
+            self.stats[c].add(result[c] + in_progress[c])
+        self.ticks += self.ticks_per_replica
+
+    def _is_precise(self) -> bool:
+        """
+        Check the stopping rule.
+        :return: True if the confidence intervals of all measures meet the absolute or the relative target.
+        """
+        for s in self.stats.values():
+            h: float = s.half_width(self.confidence)
+            meets_abs: bool = self.abs_precision is not None and h <= self.abs_precision
+            meets_rel: bool = self.rel_precision is not None and h <= self.rel_precision * abs(s.mean)
+            if not meets_abs and not meets_rel:
+                return False
+        return True
+
+
+def mser_truncation(series: list[float]) -> int:
+    """
+    Find the end of the warm-up period of a series with the Marginal Standard Error Rule (MSER): the truncation point d minimises the squared standard error
+    of the mean of the observations left after dropping the first d ones. Only the first half of the series is searched.
+    :param series: the observations, in time order.
+    :return: the number of observations to drop from the start of the series.
+    """
+    n: int = len(series)
+    # Suffix sums, so that the mean and the spread of each truncated series come in O(1)
+    s1: float = 0.0
+    s2: float = 0.0
+    suffix: list[tuple[float, float]] = [(0.0, 0.0)] * (n + 1)
+    for i in range(n - 1, -1, -1):
+        s1 += series[i]
+        s2 += series[i] * series[i]
+        suffix[i] = (s1, s2)
+    best_d: int = 0
+    best_mser: float = math.inf
+    for d in range(n // 2 + 1):
+        m: int = n - d
+        if m < 2:
+            break
+        t1, t2 = suffix[d]
+        mser: float = max(0.0, t2 - t1 * t1 / m) / (m * m)
+        if mser < best_mser:
+            best_d, best_mser = d, mser
+    return best_d
+
+
+def batch_means(series: list[float], batches: int) -> RunningStats:
+    """
+    Split a series into non-overlapping batches of equal length and summarise the batch means.
+    :param series: the observations, in time order. Observations left over at the start of the series after splitting are dropped.
+    :param batches: the number of batches.
+    :return: the running statistics of the batch means.
+    """
+    length: int = len(series) // batches
+    assert length > 0, f'Cannot split {len(series)} observations into {batches} batches'
+    result: RunningStats = RunningStats()
+    start: int = len(series) - batches * length
+    for i in range(start, len(series), length):
+        result.add(sum(series[i:i + length]) / length)
+    return result
+
+
+class SteadyStateEstimator:
+    """
+    Run one long simulation of the conveyor belt, detect the end of its warm-up period and estimate the steady-state rates (per tick) of the measures with batch
+    means over the rest of the run.
+    """
+    DEFAULT_BATCHES: int = 30
+    MSER_BATCH: int = 5  # MSER-5: the rule is applied to the means of consecutive groups of 5 ticks
+
+    def __init__(self, size: int, ticks: int, fill: bool = False, batches: int = DEFAULT_BATCHES, confidence: float = SequentialEstimator.DEFAULT_CONFIDENCE,
+                 active: bool = False, keyed: bool = False):
+        """
+        Create a steady-state estimator.
+        :param size: the size of the conveyor belt.
+        :param ticks: the number of ticks of the long run.
+        :param fill: whether to pre-fill the belt or not.
+        :param batches: the number of batches for the batch means.
+        :param confidence: the confidence level of the confidence intervals.
+        :param active: whether to run the simulation in active-set mode or not.
+        :param keyed: whether to run the simulation with keyed random streams, seeded from the global `random` stream, or not.
+        """
+        assert size > 0 and batches > 1
+        assert ticks >= 2 * batches * self.MSER_BATCH, f'At least {2 * batches * self.MSER_BATCH} ticks are needed for {batches} batches'
+        self.size: int = size
+        self.ticks: int = ticks
+        self.fill: bool = fill
+        self.batches: int = batches
+        self.confidence: float = confidence
+        self.active: bool = active
+        self.keyed: bool = keyed
+        self.warm_up: int = 0
+        self.rates: dict[str, RunningStats] = {}
+
+    def run(self):
+        """
+        Run the long simulation and compute the estimates.
+        """
+        b: Belt = Belt(self.size, active=self.active, seed=random.getrandbits(64) if self.keyed else None)
+        if self.fill:
+            b.pre_fill()
+        series: dict[str, list[float]] = {m: [] for m in MEASURES}
+        for _ in range(self.ticks // self.MSER_BATCH):
+            result, _ = b.work(self.MSER_BATCH)
+            for m in MEASURES:
+                series[m].append(result[m] / self.MSER_BATCH)
+        # Truncate at the latest warm-up end across measures, so that all rates come from the same part of the run
+        d: int = max(mser_truncation(s) for s in series.values())
+        if d == len(series[FINISHED]) // 2:
+            _logger.warning(f'No end of the warm-up period found in the first half of the run; the run of {self.ticks} ticks may be too short')
+        self.warm_up = d * self.MSER_BATCH
+        for m in MEASURES:
+            self.rates[m] = batch_means(series[m][d:], self.batches)
+        _logger.info(f'Warm-up of {self.warm_up} ticks; rates: ' + ', '.join(f'{m}={s.mean:.4f}±{s.half_width(self.confidence):.4f}' for m, s in self.rates.items()))
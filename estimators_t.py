@@ -0,0 +1,105 @@
+import random
+import statistics
+import unittest
+
+from constants import FINISHED, COMPONENTS
+from estimators import RunningStats, SequentialEstimator, SteadyStateEstimator, batch_means, mser_truncation, t_value, z_value
+
+
+class TestEstimators(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print('Testing estimators...')
+
+    def setUp(self):
+        self.org_state = random.getstate()
+        random.seed(4242)
+
+    def tearDown(self):
+        random.setstate(self.org_state)
+
+    def test_running_stats(self):
+        xs: list[float] = [3, 1, 4, 1, 5, 9, 2, 6]
+        s: RunningStats = RunningStats()
+        for x in xs:
+            s.add(x)
+        self.assertEqual(s.count, len(xs))
+        self.assertAlmostEqual(s.mean, statistics.mean(xs))
+        self.assertAlmostEqual(s.variance, statistics.variance(xs))
+
+    def test_running_stats_merge(self):
+        xs: list[float] = [3, 1, 4, 1, 5, 9, 2, 6]
+        a: RunningStats = RunningStats()
+        b: RunningStats = RunningStats()
+        for i, x in enumerate(xs):
+            (a if i < 3 else b).add(x)
+        a.merge(RunningStats.from_tuple(b.to_tuple()))
+        a.merge(RunningStats())
+        self.assertEqual(a.count, len(xs))
+        self.assertAlmostEqual(a.mean, statistics.mean(xs))
+        self.assertAlmostEqual(a.variance, statistics.variance(xs))
+
+    def test_running_stats_single_observation(self):
+        s: RunningStats = RunningStats()
+        s.add(7)
+        self.assertEqual(s.half_width(0.95), float('inf'))
+
+    def test_z_value(self):
+        self.assertAlmostEqual(z_value(0.95), 1.96, places=2)
+
+    def test_t_value(self):
+        self.assertAlmostEqual(t_value(0.95, 1), 12.706, places=3)
+        self.assertAlmostEqual(t_value(0.95, 2), 4.303, places=3)
+        self.assertAlmostEqual(t_value(0.95, 10), 2.228, places=3)
+        self.assertAlmostEqual(t_value(0.99, 30), 2.750, places=3)
+        self.assertAlmostEqual(t_value(0.95, 200), 1.972, places=3)
+
+    def test_sequential_converges(self):
+        estimator: SequentialEstimator = SequentialEstimator(3, 100, abs_precision=2.0)
+        self.assertTrue(estimator.run())
+        self.assertEqual(estimator.ticks, estimator.replicas * 100)
+        self.assertEqual(estimator.replicas % estimator.batch, 0)
+        for c in FINISHED + COMPONENTS:
+            self.assertLessEqual(estimator.stats[c].half_width(estimator.confidence), 2.0)
+
+    def test_sequential_pilot(self):
+        estimator: SequentialEstimator = SequentialEstimator(3, 5, abs_precision=0.1, batch=2)
+        self.assertTrue(estimator.run())
+        self.assertGreaterEqual(estimator.replicas, SequentialEstimator.MIN_REPLICAS)
+        self.assertEqual((estimator.replicas - SequentialEstimator.MIN_REPLICAS) % 2, 0)
+
+    def test_sequential_budget(self):
+        estimator: SequentialEstimator = SequentialEstimator(3, 100, rel_precision=1e-6, budget=2500)
+        self.assertFalse(estimator.run())
+        self.assertEqual(estimator.replicas, 25)
+        self.assertLessEqual(estimator.ticks, 2500)
+
+    def test_sequential_budget_after_target(self):
+        # The budget runs out in the middle of the first batch, after enough replicas for the target
+        estimator: SequentialEstimator = SequentialEstimator(3, 100, abs_precision=1.0, batch=1000, budget=50_000)
+        self.assertTrue(estimator.run())
+        self.assertEqual(estimator.replicas, 500)
+        self.assertTrue(estimator.converged)
+
+    def test_mser_truncation(self):
+        series: list[float] = [10.0, 8.0, 6.0, 4.0] + [1.0, 0.0] * 20
+        self.assertEqual(mser_truncation(series), 4)
+        self.assertEqual(mser_truncation([1.0, 0.0] * 20), 0)
+
+    def test_batch_means(self):
+        s: RunningStats = batch_means([9.0] + [1.0, 3.0, 5.0, 7.0] * 2, 4)
+        self.assertEqual(s.count, 4)
+        self.assertAlmostEqual(s.mean, 4.0)
+        self.assertAlmostEqual(s.variance, 16 / 3)
+
+    def test_steady_state(self):
+        estimator: SteadyStateEstimator = SteadyStateEstimator(3, 20000)
+        estimator.run()
+        self.assertLess(estimator.warm_up, 10000)
+        self.assertEqual(estimator.rates[FINISHED].count, estimator.batches)
+        self.assertAlmostEqual(estimator.rates[FINISHED].mean, 0.3, delta=0.02)
+
+
+if __name__ == '__main__':
+    unittest.main()
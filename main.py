@@ -3,6 +3,7 @@ import logging
 
 from belt import Belt
 from constants import FINISHED
+from estimators import SequentialEstimator, SteadyStateEstimator
 
 DEFAULT_ITER_NUM: int = 100
 DEFAULT_SIZE: int = 3
@@ -21,10 +22,50 @@ parser.add_argument("-r", "--rand", type=int, help="Fix the random seed for repr
 parser.add_argument("-f", "--fill", action="store_true", help="Whether to fill the belt with random components initially or not.")
 parser.add_argument("-v", "--verbose", action="store_true", help="Verbose mode, printing INFO logging.")
 parser.add_argument("-d", "--debug", action="store_true", help="Debug mode, printing DEBUG logging.")
+parser.add_argument("--active-set", action="store_true", help="Make only the workers that can act work at each tick (faster on long belts).")
+parser.add_argument("-k", "--keyed", action="store_true", help="Draw random numbers from streams keyed by the seed, the tick and the station, so that all modes "
+                                                               "give identical results for the same seed.")
+parser.add_argument("-t", "--track", action="store_true", help="Track the items to report histograms of the dwell time of the components until their first "
+                                                               "pick-up and of the lead time of the finished products.")
+parser.add_argument("-a", "--abs-precision", type=float, help="Run replicas of the simulation in batches until the half-width of every confidence interval "
+                                                               "drops below this absolute value.")
+parser.add_argument("-e", "--rel-precision", type=float, help="Run replicas of the simulation in batches until the half-width of every confidence interval "
+                                                               "drops below this fraction of the estimated mean.")
+parser.add_argument("-c", "--confidence", type=float, default=SequentialEstimator.DEFAULT_CONFIDENCE,
+                    help=f"Confidence level of the confidence intervals. Default is {SequentialEstimator.DEFAULT_CONFIDENCE}.")
+parser.add_argument("-b", "--budget", type=int, default=SequentialEstimator.DEFAULT_BUDGET,
+                    help=f"Maximum number of ticks to spend over all replicas. Default is {SequentialEstimator.DEFAULT_BUDGET}.")
+parser.add_argument("--batch", type=int, default=SequentialEstimator.DEFAULT_BATCH,
+                    help=f"Number of replicas to run between two checks of the precision, after a pilot of {SequentialEstimator.MIN_REPLICAS} replicas. "
+                         f"Default is {SequentialEstimator.DEFAULT_BATCH}.")
+parser.add_argument("-l", "--long", action="store_true", help="Run one long simulation, truncate its warm-up period and estimate the steady-state rates per tick "
+                                                              "with batch means.")
+parser.add_argument("--batches", type=int, default=SteadyStateEstimator.DEFAULT_BATCHES,
+                    help=f"Number of batches for the batch means of a long simulation. Default is {SteadyStateEstimator.DEFAULT_BATCHES}.")
 
 
 # Parse the arguments
 args = parser.parse_args()
+sequential: bool = args.abs_precision is not None or args.rel_precision is not None
+if not 0.0 < args.confidence < 1.0:
+    parser.error("-c/--confidence must be between 0 and 1")
+for name, value in (("-a/--abs-precision", args.abs_precision), ("-e/--rel-precision", args.rel_precision), ("-b/--budget", args.budget)):
+    if value is not None and value < 0:
+        parser.error(f"{name} must not be negative")
+if args.batch < 1:
+    parser.error("--batch must be at least 1")
+if sequential and (args.print or args.offset != Belt.DEFAULT_OFFSET):
+    parser.error("-p/--print and -o/--offset only apply to a single run, not to the replicas of -a/--abs-precision or -e/--rel-precision")
+if sequential and args.long:
+    parser.error("-l/--long cannot be combined with -a/--abs-precision or -e/--rel-precision")
+if args.long and (args.print or args.offset != Belt.DEFAULT_OFFSET):
+    parser.error("-p/--print and -o/--offset only apply to a single run, not to the long run of -l/--long")
+if args.track and (sequential or args.long):
+    parser.error("-t/--track only applies to a single run, not to -a/--abs-precision, -e/--rel-precision or -l/--long")
+if args.batches < 2:
+    parser.error("--batches must be at least 2")
+if args.long and args.number < 2 * args.batches * SteadyStateEstimator.MSER_BATCH:
+    parser.error(f"a long simulation with {args.batches} batches needs at least {2 * args.batches * SteadyStateEstimator.MSER_BATCH} iterations")
 print("Running the simulation with the following parameters:")
 print(f"  Number of iterations            : {args.number}")
 print(f"  Size of the conveyor belt       : {args.size}")
@@ -33,7 +74,20 @@ print(f"  Offset for pretty-printing      : {args.offset}")
 print(f"  Fill the belt initially         : {args.fill}")
 print(f"  Verbose mode (log INFO level)   : {args.verbose}")
 print(f"  Debug mode (log at DEBUG level) : {args.debug}")
+print(f"  Active-set mode                 : {args.active_set}")
+print(f"  Keyed random streams            : {args.keyed}")
+print(f"  Track dwell and lead times      : {args.track}")
 print(f"  Random seed                     : {str(args.rand) if args.rand else 'generated by the system'}")
+if sequential:
+    print(f"  Absolute precision              : {args.abs_precision if args.abs_precision is not None else 'none'}")
+    print(f"  Relative precision              : {args.rel_precision if args.rel_precision is not None else 'none'}")
+    print(f"  Confidence level                : {args.confidence}")
+    print(f"  Budget (ticks)                  : {args.budget}")
+    print(f"  Replicas per batch              : {args.batch}")
+if args.long:
+    print(f"  Long run with batch means       : {args.long}")
+    print(f"  Number of batches               : {args.batches}")
+    print(f"  Confidence level                : {args.confidence}")
 
 # Set logging
 logging.basicConfig(level=logging.WARNING)
@@ -45,22 +99,54 @@ if args.debug:
 # Fix random seed, if needed
 if args.rand:
     random.seed(args.rand)
+seed: int | None = (args.rand if args.rand else random.getrandbits(63)) if args.keyed else None
 
-# Create the belt
-b: Belt = Belt(args.size, pretty_print=args.print, offset=args.offset)
+if sequential:
+    # Run replicas until the estimates are precise enough
+    estimator: SequentialEstimator = SequentialEstimator(args.size, args.number, fill=args.fill, abs_precision=args.abs_precision, rel_precision=args.rel_precision,
+                                                         confidence=args.confidence, batch=args.batch, budget=args.budget,
+                                                         active=args.active_set, keyed=args.keyed)
+    converged: bool = estimator.run()
 
-# Pre-fill the belt, if needed
-if args.fill:
-    b.pre_fill()
+    # Print the results
+    print(f"\n{'Target precision reached' if converged else 'Budget exhausted'} after {estimator.replicas} replicas of {args.number} ticks "
+          f"({estimator.ticks} ticks in total)")
+    for c, st in estimator.stats.items():
+        what: str = "finished products generated" if c == FINISHED else f"'{c}' components untouched by any worker"
+        print(f"Mean number of {what} in {args.number} ticks: {st.mean:.4f} ± {st.half_width(args.confidence):.4f}")
+elif args.long:
+    # Run one long simulation and estimate the steady-state rates
+    steady: SteadyStateEstimator = SteadyStateEstimator(args.size, args.number, fill=args.fill, batches=args.batches, confidence=args.confidence,
+                                                        active=args.active_set, keyed=args.keyed)
+    steady.run()
 
-# Run the simulation
-result, changes = b.work(args.number)
-in_progress: dict[str, int] = b.get_in_progress()
+    # Print the results
+    print(f"\nWarm-up period detected: {steady.warm_up} of {args.number} ticks")
+    for c, st in steady.rates.items():
+        what: str = "finished products generated" if c == FINISHED else f"'{c}' components leaving the belt untouched by any worker"
+        print(f"Steady-state number of {what} per tick: {st.mean:.4f} ± {st.half_width(args.confidence):.4f}")
+else:
+    # Create the belt
+    b: Belt = Belt(args.size, pretty_print=args.print, offset=args.offset, active=args.active_set, seed=seed, track=args.track)
 
-# Print the results
-print(f"\nNumber of finished products generated in {args.number} ticks: {result[FINISHED]}")
-for c, n in result.items():
-    if c != FINISHED:
-        print(f"Number of '{c}' components untouched by any worker (generated or still on the belt): {n + in_progress[c]}")
-print(f"Number of conveyor belt changes in {args.number} ticks: {changes}")
+    # Pre-fill the belt, if needed
+    if args.fill:
+        b.pre_fill()
+
+    # Run the simulation
+    result, changes = b.work(args.number)
+    in_progress: dict[str, int] = b.get_in_progress()
+
+    # Print the results
+    print(f"\nNumber of finished products generated in {args.number} ticks: {result[FINISHED]}")
+    for c, n in result.items():
+        if c != FINISHED:
+            print(f"Number of '{c}' components untouched by any worker (generated or still on the belt): {n + in_progress[c]}")
+    print(f"Number of conveyor belt changes in {args.number} ticks: {changes}")
+    if b.provenance is not None:
+        for what, h in (("Dwell time of the components until their first pick-up", b.provenance.dwell),
+                        ("Lead time from the arrival of the first component to the finished product on the belt", b.provenance.lead)):
+            print(f"{what} (ticks): mean {h.mean:.2f}, median <= {h.quantile(0.5)}, 90% <= {h.quantile(0.9)}, max {h.max} ({h.count} items)")
+            for low, high, n in h.rows():
+                print(f"  {f'[{low}, {high}]':<12}: {n}")
 print("Done.")
@@ -0,0 +1,67 @@
+import argparse
+import logging
+import os
+
+from constants import COMPONENTS, EMPTY
+from estimators import RunningStats
+from optimizer import LayoutOptimizer
+
+DEFAULT_ITER_NUM: int = 1000
+DEFAULT_SIZE: int = 6
+DEFAULT_MIX: str = COMPONENTS + EMPTY
+
+if __name__ == '__main__':
+    # Create the parser
+    parser = argparse.ArgumentParser(prog="python optimize.py",
+                                     description="Search the number and the positions of the pairs of workers along a conveyor belt for the best trade-offs between "
+                                                 "finished products per tick and number of workers. See ./README.md for details.",
+                                     epilog="If this program does not work, check README.md and also run main_t.py.")
+    parser.add_argument("-n", "--number", type=int, default=DEFAULT_ITER_NUM, help=f"Number of iterations of each simulation. Default is {DEFAULT_ITER_NUM}.")
+    parser.add_argument("-s", "--size", type=int, default=DEFAULT_SIZE, help=f"Size of the conveyor belt. Default is {DEFAULT_SIZE}.")
+    parser.add_argument("-m", "--mix", default=DEFAULT_MIX, help=f"What may enter the belt at each tick, each character being equally likely; use a space for "
+                                                                 f"nothing and repeat characters to make them more likely. Default is {DEFAULT_MIX!r}.")
+    parser.add_argument("-x", "--max-stations", type=int, help="Largest number of pairs of workers to consider. Default is one per slot.")
+    parser.add_argument("-R", "--replicas", type=int, default=LayoutOptimizer.DEFAULT_REPLICAS,
+                        help=f"Number of simulations of each layout per round. Default is {LayoutOptimizer.DEFAULT_REPLICAS}.")
+    parser.add_argument("-g", "--rounds", type=int, default=LayoutOptimizer.DEFAULT_ROUNDS,
+                        help=f"Number of rounds of simulations and pruning. Default is {LayoutOptimizer.DEFAULT_ROUNDS}.")
+    parser.add_argument("-C", "--candidates", type=int, default=LayoutOptimizer.DEFAULT_CANDIDATES,
+                        help=f"Largest number of layouts to consider per number of pairs; beyond it, layouts are sampled. Default is {LayoutOptimizer.DEFAULT_CANDIDATES}.")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="Number of processes to simulate in. Default is the number of CPUs.")
+    parser.add_argument("-r", "--rand", type=int, default=1, help="Seed of the simulations and of the sampling of layouts. Default is 1.")
+    parser.add_argument("-f", "--fill", action="store_true", help="Whether to fill the belt with random components initially or not.")
+    parser.add_argument("-c", "--confidence", type=float, default=0.95, help="Confidence level of the confidence intervals. Default is 0.95.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Verbose mode, printing INFO logging of the optimizer.")
+
+    # Parse the arguments
+    args = parser.parse_args()
+    if not args.mix or any(c not in DEFAULT_MIX for c in args.mix):
+        parser.error(f"the mix may only contain {DEFAULT_MIX!r}")
+    print("Optimizing the layout with the following parameters:")
+    print(f"  Number of iterations            : {args.number}")
+    print(f"  Size of the conveyor belt       : {args.size}")
+    print(f"  Arrival mix                     : {args.mix!r}")
+    print(f"  Maximum number of pairs         : {args.max_stations if args.max_stations else args.size}")
+    print(f"  Simulations per round           : {args.replicas}")
+    print(f"  Rounds                          : {args.rounds}")
+    print(f"  Candidates per number of pairs  : {args.candidates}")
+    print(f"  Processes                       : {args.jobs}")
+    print(f"  Random seed                     : {args.rand}")
+
+    # Set logging
+    logging.basicConfig(level=logging.WARNING)
+    if args.verbose:
+        logging.getLogger('optimizer').setLevel(logging.INFO)
+
+    # Run the optimization
+    optimizer: LayoutOptimizer = LayoutOptimizer(args.size, args.number, mix=args.mix, max_stations=args.max_stations, replicas=args.replicas, rounds=args.rounds,
+                                                 candidates=args.candidates, seed=args.rand, fill=args.fill, confidence=args.confidence, jobs=args.jobs)
+    front: list[tuple[int, ...]] = optimizer.run()
+
+    # Print the Pareto front
+    print("\nPareto front of finished products per tick against number of workers:")
+    for layout in front:
+        st: RunningStats = optimizer.stats[layout]
+        print(f"  {LayoutOptimizer.workers(layout):3} workers, stations at {', '.join(str(i) for i in layout):<24}: "
+              f"{st.mean:.4f} ± {st.half_width(args.confidence):.4f} products per tick ({st.mean / LayoutOptimizer.workers(layout):.4f} per worker)")
+    print("Done.")
@@ -0,0 +1,169 @@
+import itertools
+import logging
+import random
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+from belt import Belt
+from constants import COMPONENTS, EMPTY, FINISHED
+from estimators import RunningStats
+
+_logger = logging.getLogger(__name__)
+
+
+def evaluate(size: int, stations: tuple[int, ...], ticks: int, seeds: list[int], mix: str, fill: bool) -> list[float]:
+    """
+    Simulate a layout of stations once per seed.
+
+    Module-level, so that it can run in a process pool.
+    :param size: the size of the conveyor belt.
+    :param stations: the slots that have a pair of workers.
+    :param ticks: the number of ticks of each simulation.
+    :param seeds: the seeds of the keyed random streams, one per simulation.
+    :param mix: what may enter the belt at each tick, each character being equally likely.
+    :param fill: whether to pre-fill the belt or not.
+    :return: the number of finished products per tick of each simulation.
+    """
+    result: list[float] = []
+    for seed in seeds:
+        b: Belt = Belt(size, active=True, seed=seed, stations=list(stations), mix=mix)
+        if fill:
+            b.pre_fill()
+        counts, _ = b.work(ticks)
+        result.append(counts[FINISHED] / ticks)
+    return result
+
+
+def pareto_front(points: dict[tuple[int, ...], tuple[int, float]]) -> list[tuple[int, ...]]:
+    """
+    Find the layouts that no other layout beats with as few workers and as many finished products per tick, one of the two strictly.
+    :param points: a dictionary from layouts to (workers, products per tick) pairs.
+    :return: the layouts of the Pareto front, by increasing number of workers.
+    """
+    front: list[tuple[int, ...]] = []
+    best: float = -1.0
+    for layout in sorted(points, key=lambda l: (points[l][0], -points[l][1])):
+        if points[layout][1] > best:
+            front.append(layout)
+            best = points[layout][1]
+    return front
+
+
+class LayoutOptimizer:
+    """
+    Search the number and the positions of the pairs of workers along a belt for the best trade-offs between finished products per tick and number of workers.
+
+    The candidate layouts are evaluated in rounds, each round adding the same fresh seeds to every layout still in the race. As the seeds key the arrivals and the
+    tie-breaks (common random numbers), all layouts see the same components coming. After each round, the layouts that are confidently dominated are dropped: some
+    other layout with no more workers makes more finished products per tick, even comparing the upper end of the confidence interval of the first with the lower
+    end of the confidence interval of the second.
+    """
+    DEFAULT_REPLICAS: int = 10
+    DEFAULT_ROUNDS: int = 4
+    DEFAULT_CANDIDATES: int = 256
+
+    def __init__(self, size: int, ticks: int, mix: str = COMPONENTS + EMPTY, max_stations: int | None = None, replicas: int = DEFAULT_REPLICAS,
+                 rounds: int = DEFAULT_ROUNDS, candidates: int = DEFAULT_CANDIDATES, seed: int = 1, fill: bool = False,
+                 confidence: float = 0.95, jobs: int = 1):
+        """
+        Create a layout optimizer.
+        :param size: the size of the conveyor belt.
+        :param ticks: the number of ticks of each simulation.
+        :param mix: what may enter the belt at each tick, each character being equally likely.
+        :param max_stations: the largest number of pairs of workers to consider, or None for one per slot.
+        :param replicas: the number of simulations of each layout per round.
+        :param rounds: the number of rounds.
+        :param candidates: the largest number of layouts to consider per number of pairs; beyond it, layouts are sampled at random.
+        :param seed: the seed of the seeds of the simulations and of the sampling of layouts.
+        :param fill: whether to pre-fill the belt or not.
+        :param confidence: the confidence level of the confidence intervals used for pruning.
+        :param jobs: the number of processes to simulate in; 1 for simulating in this process.
+        """
+        assert size > 0 and ticks > 0 and replicas > 1 and rounds > 0 and candidates > 0 and jobs > 0
+        self.size: int = size
+        self.ticks: int = ticks
+        self.mix: str = mix
+        self.max_stations: int = size if max_stations is None else min(size, max_stations)
+        self.replicas: int = replicas
+        self.rounds: int = rounds
+        self.candidates: int = candidates
+        self.seed: int = seed
+        self.fill: bool = fill
+        self.confidence: float = confidence
+        self.jobs: int = jobs
+        self.stats: dict[tuple[int, ...], RunningStats] = {}
+
+    def layouts(self) -> list[tuple[int, ...]]:
+        """
+        Enumerate the candidate layouts: all of them per number of pairs if few enough, otherwise the evenly spaced one plus a random sample.
+        :return: the candidate layouts, as sorted tuples of slots.
+        """
+        rng: random.Random = random.Random(self.seed)
+        result: list[tuple[int, ...]] = []
+        for k in range(1, self.max_stations + 1):
+            layouts: list[tuple[int, ...]] = list(itertools.islice(itertools.combinations(range(self.size), k), self.candidates + 1))
+            if len(layouts) > self.candidates:
+                sampled: set[tuple[int, ...]] = {tuple(round(i * (self.size - 1) / max(1, k - 1)) for i in range(k))}
+                while len(sampled) < self.candidates:
+                    sampled.add(tuple(sorted(rng.sample(range(self.size), k))))
+                layouts = sorted(sampled)
+            result.extend(layouts)
+        return result
+
+    def run(self) -> list[tuple[int, ...]]:
+        """
+        Run the rounds of evaluations and pruning.
+        :return: the layouts of the Pareto front, by increasing number of workers.
+        """
+        alive: list[tuple[int, ...]] = self.layouts()
+        self.stats = {layout: RunningStats() for layout in alive}
+        executor: Executor | None = ProcessPoolExecutor(max_workers=self.jobs) if self.jobs > 1 else None
+        try:
+            for r in range(self.rounds):
+                seeds: list[int] = [self.seed * 1_000_003 + r * self.replicas + i for i in range(self.replicas)]
+                args: list[tuple] = [(self.size, layout, self.ticks, seeds, self.mix, self.fill) for layout in alive]
+                if executor is None:
+                    results = itertools.starmap(evaluate, args)
+                else:
+                    results = executor.map(evaluate, *zip(*args))
+                for layout, values in zip(alive, results):
+                    for v in values:
+                        self.stats[layout].add(v)
+                before: int = len(alive)
+                alive = self._prune(alive)
+                _logger.info(f'Round {r + 1}: kept {len(alive)} of {before} layouts')
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return pareto_front({layout: (self.workers(layout), self.stats[layout].mean) for layout in alive})
+
+    @staticmethod
+    def workers(layout: tuple[int, ...]) -> int:
+        """
+        Get the number of workers of a layout.
+        :param layout: the layout.
+        :return: two workers per station.
+        """
+        return 2 * len(layout)
+
+    def _prune(self, alive: list[tuple[int, ...]]) -> list[tuple[int, ...]]:
+        """
+        Drop the layouts that are confidently dominated.
+        :param alive: the layouts still in the race.
+        :return: the layouts that stay in the race.
+        """
+        # For each number of workers, the best lower confidence bound among the layouts with that many workers or fewer
+        lower: dict[int, float] = {}
+        for layout in alive:
+            s: RunningStats = self.stats[layout]
+            w: int = self.workers(layout)
+            lower[w] = max(lower.get(w, -1.0), s.mean - s.half_width(self.confidence))
+        best: float = -1.0
+        for w in sorted(lower):
+            best = max(best, lower[w])
+            lower[w] = best
+        result: list[tuple[int, ...]] = []
+        for layout in alive:
+            s: RunningStats = self.stats[layout]
+            if s.mean + s.half_width(self.confidence) >= lower[self.workers(layout)]:
+                result.append(layout)
+        return result
@@ -0,0 +1,46 @@
+import unittest
+
+from estimators import RunningStats
+from optimizer import LayoutOptimizer, evaluate, pareto_front
+
+
+class TestOptimizer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print('Testing LayoutOptimizer class...')
+
+    def test_pareto_front(self):
+        points: dict[tuple[int, ...], tuple[int, float]] = {(0,): (2, 0.2), (1,): (2, 0.1), (0, 1): (4, 0.3), (0, 2): (4, 0.25), (0, 1, 2): (6, 0.3)}
+        self.assertEqual(pareto_front(points), [(0,), (0, 1)])
+
+    def test_layouts(self):
+        self.assertEqual(len(LayoutOptimizer(4, 10).layouts()), 15)
+        sampled: list[tuple[int, ...]] = LayoutOptimizer(20, 10, max_stations=3, candidates=50).layouts()
+        self.assertEqual(len(sampled), 20 + 50 + 50)
+        self.assertIn((0, 10, 19), sampled)
+
+    def test_prune(self):
+        optimizer: LayoutOptimizer = LayoutOptimizer(3, 10)
+        values: dict[tuple[int, ...], list[float]] = {(0,): [0.20, 0.21, 0.19], (1,): [0.21, 0.19, 0.20], (0, 1): [0.30, 0.31, 0.29], (0, 2): [0.10, 0.11, 0.09],
+                                                      (0, 1, 2): [0.19, 0.20, 0.21]}
+        for layout, vs in values.items():
+            optimizer.stats[layout] = RunningStats()
+            for v in vs:
+                optimizer.stats[layout].add(v)
+        self.assertEqual(optimizer._prune(list(values)), [(0,), (1,), (0, 1)])
+
+    def test_common_random_numbers(self):
+        self.assertEqual(evaluate(4, (0, 2), 100, [1, 2], 'AB ', False), evaluate(4, (0, 2), 100, [1, 2], 'AB ', False))
+
+    def test_run(self):
+        optimizer: LayoutOptimizer = LayoutOptimizer(3, 100, replicas=3, rounds=2)
+        front: list[tuple[int, ...]] = optimizer.run()
+        self.assertGreater(len(front), 0)
+        for a, b in zip(front, front[1:]):
+            self.assertLess(LayoutOptimizer.workers(a), LayoutOptimizer.workers(b))
+            self.assertLess(optimizer.stats[a].mean, optimizer.stats[b].mean)
+
+
+if __name__ == '__main__':
+    unittest.main()
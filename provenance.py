@@ -0,0 +1,166 @@
+from array import array
+
+from constants import COMPONENTS
+
+#
+# Item ID of an empty slot or an empty hand.
+#
+NO_ITEM: int = -1
+
+
+class LogHistogram:
+    """
+    A fixed-memory histogram of non-negative integers, in buckets of exponentially growing width.
+
+    Bucket 0 counts the zeros and bucket b > 0 counts the values in [2**(b-1), 2**b).
+    """
+    BUCKETS: int = 64
+
+    def __init__(self):
+        """
+        Create an empty histogram.
+        """
+        self.counts: array = array('q', [0]) * (self.BUCKETS + 1)
+        self.count: int = 0
+        self.total: int = 0
+        self.max: int = 0
+
+    def add(self, value: int):
+        """
+        Count a value.
+        :param value: the non-negative value to count.
+        """
+        assert value >= 0
+        self.counts[value.bit_length()] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        """
+        Get the exact mean of the values counted.
+        :return: the mean, or 0 if no values were counted.
+        """
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> int:
+        """
+        Get an upper bound of a quantile of the values counted.
+        :param q: the quantile, in [0, 1].
+        :return: the largest value of the bucket holding the quantile, capped by the largest value counted.
+        """
+        assert 0.0 <= q <= 1.0
+        rank: float = q * self.count
+        seen: int = 0
+        for b, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                return min(self.max, (1 << b) - 1)
+        return self.max
+
+    def rows(self) -> list[tuple[int, int, int]]:
+        """
+        Get the non-empty buckets of the histogram.
+        :return: a list of (low, high, count) tuples, for the values in [low, high].
+        """
+        return [((1 << b) >> 1, (1 << b) - 1, n) for b, n in enumerate(self.counts) if n]
+
+
+class Provenance:
+    """
+    Track the items on the belt and in the hands of the workers, to measure their latencies.
+
+    Each component gets an integer ID when it enters the belt and each finished product gets one when its assembly completes. The IDs of the items on the belt are
+    kept in an array aligned with the slots of the belt; the workers keep the IDs of the items in their hands. IDs are recycled when items leave the belt or get
+    assembled, so all arrays are preallocated for the most items that can exist at once. Two latencies are measured:
+    - dwell time: from a component entering the belt to its first pick-up by a worker
+    - lead time: from the first of its components entering the belt to a finished product being set on the belt
+    """
+
+    def __init__(self, size: int, workers: int):
+        """
+        Create the tracking of a belt.
+        :param size: the number of slots of the belt.
+        :param workers: the number of workers around the belt.
+        """
+        capacity: int = size + 2 * workers + 1  # full belt, full hands and one product being assembled from two components
+        self.ids: array = array('l', [NO_ITEM]) * size
+        self.entry: array = array('q', [0]) * capacity
+        self.picked: bytearray = bytearray(capacity)
+        self._free: array = array('l', range(capacity - 1, -1, -1))
+        self.now: int = 0
+        self.dwell: LogHistogram = LogHistogram()
+        self.lead: LogHistogram = LogHistogram()
+
+    def shift(self, tick: int, entered: str):
+        """
+        Shift the IDs along with the belt.
+        :param tick: the tick of the shift.
+        :param entered: the component (or nothing) that entered the belt.
+        """
+        self.now = tick
+        if self.ids[-1] != NO_ITEM:
+            self._free.append(self.ids[-1])
+        self.ids[1:] = self.ids[:-1]
+        self.ids[0] = self._new(tick) if entered in COMPONENTS else NO_ITEM
+
+    def take(self, slot: int) -> int:
+        """
+        Take the component from a slot into a hand.
+        :param slot: the slot.
+        :return: the ID of the component.
+        """
+        item: int = self.ids[slot]
+        self.ids[slot] = NO_ITEM
+        if not self.picked[item]:
+            self.picked[item] = 1
+            self.dwell.add(self.now - self.entry[item])
+        return item
+
+    def put(self, slot: int, item: int, finished: bool):
+        """
+        Put an item from a hand onto an empty slot.
+        :param slot: the slot.
+        :param item: the ID of the item.
+        :param finished: whether the item is a finished product or not.
+        """
+        self.ids[slot] = item
+        if finished:
+            self.lead.add(self.now - self.entry[item])
+
+    def exchange(self, slot: int, item: int, finished: bool) -> int:
+        """
+        Swap an item from a hand with the one in a slot.
+        :param slot: the slot.
+        :param item: the ID of the item put onto the slot.
+        :param finished: whether the item put onto the slot is a finished product or not.
+        :return: the ID of the item taken from the slot, or NO_ITEM if the slot was empty.
+        """
+        taken: int = self.take(slot) if self.ids[slot] != NO_ITEM else NO_ITEM
+        self.put(slot, item, finished)
+        return taken
+
+    def assemble(self, left: int, right: int) -> int:
+        """
+        Assemble two components into a finished product.
+        :param left: the ID of one component.
+        :param right: the ID of the other component.
+        :return: the ID of the finished product.
+        """
+        product: int = self._new(min(self.entry[left], self.entry[right]))
+        self._free.append(left)
+        self._free.append(right)
+        return product
+
+    def _new(self, entry: int) -> int:
+        """
+        Allocate an ID.
+        :param entry: the tick the item entered the belt.
+        :return: the ID.
+        """
+        item: int = self._free.pop()
+        self.entry[item] = entry
+        self.picked[item] = 0
+        return item
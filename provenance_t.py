@@ -0,0 +1,52 @@
+import unittest
+
+from belt import Belt
+from constants import EMPTY, ASSEMBLY_DURATION
+from provenance import LogHistogram, NO_ITEM
+
+
+class TestProvenance(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print('Testing Provenance class...')
+
+    def test_log_histogram(self):
+        h: LogHistogram = LogHistogram()
+        for v in (0, 1, 2, 3, 4, 100):
+            h.add(v)
+        self.assertEqual(h.rows(), [(0, 0, 1), (1, 1, 1), (2, 3, 2), (4, 7, 1), (64, 127, 1)])
+        self.assertAlmostEqual(h.mean, 110 / 6)
+        self.assertEqual(h.quantile(0.5), 3)
+        self.assertEqual(h.quantile(1.0), 100)
+
+    def test_untracked_by_default(self):
+        belt: Belt = Belt(3)
+        self.assertIsNone(belt.provenance)
+        self.assertIsNone(belt.pairs[0].up.provenance)
+
+    def test_ids_follow_items(self):
+        for seed in range(1, 6):
+            belt: Belt = Belt(4, seed=seed, track=True)
+            belt.pre_fill()
+            for _ in range(40):
+                belt.work(10)
+                live: list[int] = [belt.provenance.ids[i] for i, c in enumerate(belt.slots) if c != EMPTY]
+                self.assertEqual(len(live), len(belt.provenance.ids) - belt.provenance.ids.count(NO_ITEM))
+                for pair in belt.pairs:
+                    for w in (pair.up, pair.down):
+                        self.assertEqual(w.left_hand != EMPTY, w.left_id != NO_ITEM)
+                        self.assertEqual(w.right_hand != EMPTY, w.right_id != NO_ITEM)
+                        live += [i for i in (w.left_id, w.right_id) if i != NO_ITEM]
+                self.assertEqual(len(live), len(set(live)))
+            self.assertGreater(belt.provenance.lead.count, 0)
+            self.assertGreaterEqual(min(low for low, _, _ in belt.provenance.lead.rows()), ASSEMBLY_DURATION)
+
+    def test_tracking_does_not_change_results(self):
+        plain: Belt = Belt(5, seed=11)
+        tracked: Belt = Belt(5, seed=11, track=True)
+        self.assertEqual(plain.work(500), tracked.work(500))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+#
+# Counter-based random numbers: each draw is a hash of (seed, stream, tick, station, counter), so that any engine can reproduce any draw without consuming a
+# shared sequence of random numbers in a fixed order.
+#
+from typing import Any, Sequence
+
+_MASK: int = (1 << 64) - 1
+_GOLDEN: int = 0x9E3779B97F4A7C15
+
+#
+# Stream of the components (or nothing) entering the belt.
+#
+ARRIVALS: int = 0
+
+#
+# Stream of the random orders in which pairs and workers take their turns.
+#
+TIE_BREAKS: int = 1
+
+
+def mix(x: int) -> int:
+    """
+    Scramble a 64-bit integer (the SplitMix64 finaliser).
+    :param x: the integer to scramble. Only its lowest 64 bits are used.
+    :return: the scrambled 64-bit integer.
+    """
+    x = (x + _GOLDEN) & _MASK
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK
+    return x ^ (x >> 31)
+
+
+class KeyedRandom:
+    """
+    A short sequence of random numbers keyed by (seed, stream, tick, station).
+
+    It offers the subset of the `random` module API used by the simulation.
+    """
+
+    def __init__(self, seed: int, stream: int, tick: int, station: int):
+        """
+        Create the sequence of random numbers of a key.
+        :param seed: the seed of the simulation.
+        :param stream: the stream, e.g. ARRIVALS or TIE_BREAKS.
+        :param tick: the tick the numbers are drawn for.
+        :param station: the slot of the station the numbers are drawn for, or -1 for the belt as a whole.
+        """
+        self._key: int = mix(mix(mix(mix(seed) ^ stream) ^ (tick & _MASK)) ^ (station & _MASK))
+        self._counter: int = 0
+
+    def getrandbits64(self) -> int:
+        """
+        Draw the next 64 random bits of the sequence.
+        :return: a random integer in [0, 2**64).
+        """
+        self._counter += 1
+        return mix(self._key + self._counter * _GOLDEN)
+
+    def randbelow(self, n: int) -> int:
+        """
+        Draw a random integer, without modulo bias.
+        :param n: the exclusive upper bound, at most 2**64.
+        :return: a random integer in [0, n).
+        """
+        assert 0 < n <= 1 << 64
+        limit: int = (1 << 64) - (1 << 64) % n
+        while True:
+            x: int = self.getrandbits64()
+            if x < limit:
+                return x % n
+
+    def choice(self, seq: Sequence) -> Any:
+        """
+        Choose a random element of a non-empty sequence.
+        :param seq: the sequence to choose from.
+        :return: the chosen element.
+        """
+        return seq[self.randbelow(len(seq))]
+
+    def sample(self, population: Sequence, k: int) -> list:
+        """
+        Choose k unique random elements of a sequence (partial Fisher-Yates shuffle).
+        :param population: the sequence to choose from.
+        :param k: the number of elements to choose.
+        :return: the chosen elements, in selection order.
+        """
+        assert 0 <= k <= len(population)
+        pool: list = list(population)
+        n: int = len(pool)
+        for i in range(k):
+            j: int = i + self.randbelow(n - i)
+            pool[i], pool[j] = pool[j], pool[i]
+        return pool[:k]
+
+
+class Streams:
+    """
+    The independent random streams of one simulation.
+    """
+
+    def __init__(self, seed: int):
+        """
+        Create the streams of a simulation.
+        :param seed: the seed of the simulation.
+        """
+        self.seed: int = seed
+
+    def arrivals(self, tick: int) -> KeyedRandom:
+        """
+        Get the random numbers deciding what enters the belt.
+        :param tick: the number of the shift of the belt; pre-filling shifts included.
+        :return: the random numbers of the arrival.
+        """
+        return KeyedRandom(self.seed, ARRIVALS, tick, 0)
+
+    def tie_breaks(self, tick: int, station: int = -1) -> KeyedRandom:
+        """
+        Get the random numbers deciding the order of the pairs (station -1) or of the workers of a pair (station = its slot).
+        :param tick: the tick.
+        :param station: the slot of the pair, or -1 for the belt as a whole.
+        :return: the random numbers of the tie-breaks.
+        """
+        return KeyedRandom(self.seed, TIE_BREAKS, tick, station)
@@ -0,0 +1,40 @@
+import unittest
+
+from rng import KeyedRandom, Streams, ARRIVALS, TIE_BREAKS
+
+
+class TestKeyedRandom(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print('Testing KeyedRandom class...')
+
+    def test_same_key_same_numbers(self):
+        a: KeyedRandom = KeyedRandom(1, TIE_BREAKS, 10, 3)
+        b: KeyedRandom = KeyedRandom(1, TIE_BREAKS, 10, 3)
+        self.assertEqual([a.getrandbits64() for _ in range(5)], [b.getrandbits64() for _ in range(5)])
+
+    def test_different_keys_different_numbers(self):
+        draws: set[int] = {KeyedRandom(1, stream, tick, station).getrandbits64()
+                           for stream in (ARRIVALS, TIE_BREAKS) for tick in range(-2, 20) for station in range(-1, 10)}
+        self.assertEqual(len(draws), 2 * 22 * 11)
+
+    def test_randbelow(self):
+        rng: KeyedRandom = Streams(5).arrivals(1)
+        counts: list[int] = [0] * 3
+        for _ in range(3000):
+            counts[rng.randbelow(3)] += 1
+        for c in counts:
+            self.assertAlmostEqual(c, 1000, delta=150)
+
+    def test_sample(self):
+        rng: KeyedRandom = Streams(5).tie_breaks(7, 2)
+        population: list[int] = list(range(10))
+        s: list[int] = rng.sample(population, 10)
+        self.assertEqual(sorted(s), population)
+        self.assertEqual(len(set(rng.sample(population, 4))), 4)
+        self.assertEqual(population, list(range(10)))
+
+
+if __name__ == '__main__':
+    unittest.main()
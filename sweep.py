@@ -0,0 +1,58 @@
+import argparse
+import logging
+
+from constants import FINISHED
+from distributed import Coordinator, DEFAULT_CHUNK, DEFAULT_PORT, run_worker
+
+DEFAULT_SIZES: list[int] = [3]
+DEFAULT_ITER_NUMS: list[int] = [100]
+DEFAULT_SEEDS: int = 100
+
+if __name__ == '__main__':
+    # Create the parser
+    parser = argparse.ArgumentParser(prog="python sweep.py",
+                                     description="Sweep simulations of a conveyor belt over belt sizes, numbers of iterations and seeds, distributed over worker processes on "
+                                                 "any number of hosts. See ./README.md for details.",
+                                     epilog="If this program does not work, check README.md and also run main_t.py.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Verbose mode, printing INFO logging of the sweep.")
+    subparsers = parser.add_subparsers(dest="role", required=True)
+    coordinator_parser = subparsers.add_parser("coordinator", help="Split the sweep into chunks, hand them out to the workers and merge their statistics.")
+    coordinator_parser.add_argument("-s", "--size", type=int, nargs='+', default=DEFAULT_SIZES, help=f"Sizes of the conveyor belt. Default is {DEFAULT_SIZES}.")
+    coordinator_parser.add_argument("-n", "--number", type=int, nargs='+', default=DEFAULT_ITER_NUMS,
+                                    help=f"Numbers of iterations to run the simulations for. Default is {DEFAULT_ITER_NUMS}.")
+    coordinator_parser.add_argument("--seeds", type=int, default=DEFAULT_SEEDS, help=f"Number of seeds per size and number of iterations. Default is {DEFAULT_SEEDS}.")
+    coordinator_parser.add_argument("-r", "--rand", type=int, default=1, help="First seed; the seeds are consecutive. Default is 1.")
+    coordinator_parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK, help=f"Number of simulations per chunk. Default is {DEFAULT_CHUNK}.")
+    coordinator_parser.add_argument("--host", default="localhost", help="Interface to listen on, e.g. 0.0.0.0 for all of them. Default is localhost.")
+    coordinator_parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on. Default is {DEFAULT_PORT}.")
+    coordinator_parser.add_argument("--timeout", type=float, help="Seconds to wait for the result of a chunk before re-queueing it. Default is no limit; lost hosts are still noticed through TCP keepalive.")
+    coordinator_parser.add_argument("-l", "--local", type=int, default=0, help="Number of worker processes to start on this host. Default is 0.")
+    coordinator_parser.add_argument("-c", "--confidence", type=float, default=0.95, help="Confidence level of the confidence intervals. Default is 0.95.")
+    worker_parser = subparsers.add_parser("worker", help="Run chunks of simulations for a coordinator.")
+    worker_parser.add_argument("--host", default="localhost", help="Host of the coordinator. Default is localhost.")
+    worker_parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port of the coordinator. Default is {DEFAULT_PORT}.")
+
+    # Parse the arguments
+    args = parser.parse_args()
+
+    # Set logging
+    logging.basicConfig(level=logging.WARNING)
+    if args.verbose:
+        logging.getLogger('distributed').setLevel(logging.INFO)
+
+    if args.role == "worker":
+        run_worker(args.host, args.port)
+    else:
+        coordinator: Coordinator = Coordinator(args.size, args.number, list(range(args.rand, args.rand + args.seeds)), chunk=args.chunk, host=args.host,
+                                               port=args.port, timeout=args.timeout)
+        print(f"Coordinating {len(coordinator.chunks)} chunks on {coordinator.address[0]}:{coordinator.address[1]} ...")
+        stats = coordinator.run(local=args.local)
+
+        # Print the results
+        print("\nMean number per simulation (± half-width of the confidence interval):")
+        for (size, ticks), group in stats.items():
+            line: str = f"  size {size:4}, {ticks:8} ticks, {group[FINISHED].count:6} seeds:"
+            for c, st in group.items():
+                line += f"  {c} {st.mean:10.4f} ± {st.half_width(args.confidence):.4f}"
+            print(line)
+        print("Done.")
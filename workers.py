@@ -1,8 +1,10 @@
 import logging
 import random
 from enum import Enum
+from typing import Any
 
 from constants import EMPTY, ASSEMBLY_DURATION, FINISHED
+from provenance import Provenance, NO_ITEM
 
 _logger = logging.getLogger(__name__)
 
@@ -55,13 +57,14 @@ class Worker:
         #
         LEFT_FULL_RIGHT_FULL_SAME_COMPONENT: int = LEFT_FULL_RIGHT_FINISHED + 1
 
-    def __init__(self, index: int, pos: str, slots: list[str], touched: list[bool]):
+    def __init__(self, index: int, pos: str, slots: list[str], touched: list[bool], provenance: Provenance | None = None):
         """
         Create a worker.
         :param index: place of the worker on the conveyor belt. 0 means the first slot.
         :param pos: position of the worker compared to the conveyor belt. UP means the worker is above the conveyor belt, DOWN means below.
         :param slots: the list of components (or empty slots) on the conveyor belt.
         :param touched: the list of flags indicating whether the corresponding slot has been touched by the worker or not.
+        :param provenance: the tracking of the items of the conveyor belt, or None if not tracking.
         """
         self.index = index
         self.pos = pos
@@ -71,6 +74,9 @@ class Worker:
         self.right_hand: str = EMPTY
         self.assembly_remaining: int = 0
         self.state = self.State.READY
+        self.provenance: Provenance | None = provenance
+        self.left_id: int = NO_ITEM
+        self.right_id: int = NO_ITEM
         assert 0 <= index < len(slots)
         assert pos in (self.UP, self.DOWN)
 
@@ -135,6 +141,14 @@ class Worker:
                 result += 1 + ASSEMBLY_DURATION + 3
         return result
 
+    @property
+    def is_holding(self) -> bool:
+        """
+        Check whether the worker holds an item that they want to get rid of at the first opportunity (a finished product or a duplicate component).
+        :return: True if the worker may act on their slot even when it is empty, False otherwise.
+        """
+        return self.state in (Worker.State.LEFT_EMPTY_RIGHT_FINISHED, Worker.State.LEFT_FULL_RIGHT_FINISHED, Worker.State.LEFT_FULL_RIGHT_FULL_SAME_COMPONENT)
+
     def work(self) -> bool:
         """
         Perform one unit of work.
@@ -173,6 +187,9 @@ class Worker:
                     _logger.info(f'Worker ({self}) is assembling. If done assembling, then will try setting the finished product back onto the assembly line ...')
                     self.assembly_remaining -= 1
                     if self.assembly_remaining == 0:
+                        if self.provenance is not None:
+                            self.right_id = self.provenance.assemble(self.left_id, self.right_id)
+                            self.left_id = NO_ITEM
                         _logger.debug(f'Worker ({self}) finished assembling. Trying to set the finished product back on the assembly line ...')
                         if self._set_finished():
                             _logger.debug(f'Worker ({self}) set the finished product back on the assembly line')
@@ -252,6 +269,8 @@ class Worker:
             self.left_hand = self.slots[self.index]
             self.slots[self.index] = EMPTY
             self.touched[self.index] = True
+            if self.provenance is not None:
+                self.left_id = self.provenance.take(self.index)
             return True
         return False
 
@@ -265,6 +284,8 @@ class Worker:
             self.right_hand = self.slots[self.index]
             self.slots[self.index] = EMPTY
             self.touched[self.index] = True
+            if self.provenance is not None:
+                self.right_id = self.provenance.take(self.index)
             return True
         return False
 
@@ -282,6 +303,9 @@ class Worker:
                 pass
             else:
                 self.left_hand = EMPTY
+            if self.provenance is not None:
+                self.provenance.put(self.index, self.right_id, finished=True)
+                self.right_id = NO_ITEM
             return True
         return False
 
@@ -296,9 +320,13 @@ class Worker:
             if c != self.right_hand:
                 self.slots[self.index] = self.right_hand
                 self.right_hand = c
+                if self.provenance is not None:
+                    self.right_id = self.provenance.exchange(self.index, self.right_id, finished=self.slots[self.index] == FINISHED)
             elif c != self.left_hand:
                 self.slots[self.index] = self.left_hand
                 self.left_hand = c
+                if self.provenance is not None:
+                    self.left_id = self.provenance.exchange(self.index, self.left_id, finished=False)
             else:
                 assert False, f'Invalid state: {self.left_hand}, {self.right_hand}, {c}'
             assert self.left_hand != FINISHED and self.right_hand != FINISHED
@@ -306,6 +334,7 @@ class Worker:
             if self.left_hand == EMPTY and self.right_hand != EMPTY:
                 self.left_hand = self.right_hand
                 self.right_hand = EMPTY
+                self.left_id, self.right_id = self.right_id, NO_ITEM
             return True
         return False
 
@@ -315,15 +344,16 @@ class WorkerPair:
     A pair of workers, one going up and the other going down compared to the conveyor belt.
     """
 
-    def __init__(self, index: int, slots: list[str], touched: list[bool]):
+    def __init__(self, index: int, slots: list[str], touched: list[bool], provenance: Provenance | None = None):
         """
         Create a pair of workers.
         :param index: the position of the workers on the conveyor belt. 0 means the first slot.
         :param slots: the list of components (or empty slots) on the conveyor belt.
         :param touched: the list of flags indicating whether the corresponding slot has been touched by the worker or not.
+        :param provenance: the tracking of the items of the conveyor belt, or None if not tracking.
         """
-        self.up = Worker(index, Worker.UP, slots, touched)
-        self.down = Worker(index, Worker.DOWN, slots, touched)
+        self.up = Worker(index, Worker.UP, slots, touched, provenance)
+        self.down = Worker(index, Worker.DOWN, slots, touched, provenance)
 
     def __str__(self):
         return f'{self.up}/=/{self.down}'
@@ -336,13 +366,14 @@ class WorkerPair:
         """
         return self.up.priority * self.down.priority
 
-    def work(self) -> bool:
+    def work(self, rng: Any = random) -> bool:
         """
         Make the workers work.
+        :param rng: the source of random numbers for breaking ties between the workers: the `random` module or a KeyedRandom.
         :return: True if any of the workers changed the assembly line, False otherwise.
         """
         workers: list[Worker] = [self.up, self.down]
-        shuffled: list[Worker] = random.sample(workers, len(workers))
+        shuffled: list[Worker] = rng.sample(workers, len(workers))
         prioritised: list[Worker] = sorted(shuffled, key=lambda w: w.priority, reverse=True)
         result: bool = False
         for worker in prioritised: